@@ -4,54 +4,36 @@ import time
 from unicodedata import numeric
 
 import cv2
-from dotenv import load_dotenv
 from HelperMethods import get_float_from_box_office
 import HelperMethods
-from ImageManager import PlaceImage, PlaceText, overlay_images_and_text
+import http_client
+from ImageManager import PlaceImage, PlaceText, compile_plan, film_strip_background, static_plan, place_image, place_text, render_on_background
+from layout import get_layout
 from Meter import Meter, MeterType
 from Movie import Movie
 from RottenTomatoesScraper import scrape_actor_data2, get_actor_birthdate
 import Wikipedia_scraper
+import movie_db
 import omdb_api
 from numerize import numerize
 
 class Actor:
     def __init__(self, name, birthdate,oscar_wins,oscar_nominations,headshot_path,movies):
-        load_dotenv(override=True)
+        layout = get_layout()
         self.movies = movies
         self.name = name
-        self.birthdate = PlaceText(text=f"({birthdate})",             
-                                   x=int(os.environ.get('BIRTHDATE_X', 0)),
-                                   y=int(os.environ.get('BIRTHDATE_Y', 0)),
-                                   scale=float(os.environ.get('BIRTHDATE_SCALE', 2.4)),
-                                   color=eval(os.environ.get('TEXT_COLOR_BLACK')),
-                                   font=os.environ.get('FONT_PATH', cv2.FONT_HERSHEY_SIMPLEX),
-                                   thickness=int(os.environ.get('BIRTHDATE_THICKNESS', 6)))
+        self.birthdate = place_text(f"({birthdate})", layout.birthdate)
         # Calculate age from birthdate
-        self.age = PlaceText(text=self.get_age(),
-                             x=int(os.environ.get('AGE_X', 0)),
-                             y=int(os.environ.get('AGE_Y', 0)),
-                             scale=float(os.environ.get('AGE_SCALE', 1)),
-                             color=eval(os.environ.get('TEXT_COLOR_BLACK')),
-                             font=os.environ.get('FONT_PATH', cv2.FONT_HERSHEY_SIMPLEX),
-                             thickness=int(os.environ.get('AGE_THICKNESS', 2)))
-        self.box_office = PlaceText(text=self.get_total_box_office(readable=True), 
-                            x=int(os.environ.get('BOX_OFFICE_X', 0)),
-                            y=int(os.environ.get('BOX_OFFICE_Y', 0)),
-                            scale=float(os.environ.get('ACTOR_BOX_OFFICE_SCALE', 1)),
-                            color=eval(os.environ.get('TEXT_COLOR_GREEN')),
-                            font=os.environ.get('FONT_PATH', cv2.FONT_HERSHEY_SIMPLEX),
-                            thickness=int(os.environ.get('ACTOR_BOX_OFFICE_THICKNESS', 2)))
-        self.movies = movies 
+        self.age = place_text(self.get_age(), layout.age)
+        self.box_office = place_text(self.get_total_box_office(readable=True), layout.actor_box_office)
         self.tomato_meter = Meter(MeterType.TOMATO, self.get_average_tomato_score())
         self.popcorn_meter = Meter(MeterType.POPCORN, self.get_average_popcorn_score())
         self.oscar_wins = oscar_wins
         self.oscar_nominations = oscar_nominations
-        self.headshot = PlaceImage(headshot_path,                                
-                            x=os.environ.get('POSTER_X'), 
-                            y=os.environ.get('POSTER_Y'),
-                            width=os.environ.get('POSTER_WIDTH'), 
-                            height=os.environ.get('POSTER_HEIGHT'))
+        self.headshot = place_image(headshot_path, layout.poster)
+        # False when saving a fresh scrape to movies.db failed: its rows there
+        # are missing or stale, so summaries are picked from self.movies
+        self.stored = True
         
     def get_average_tomato_score(self):
         valid_scores = [movie.tomato_meter.score for movie in self.movies if isinstance(movie.tomato_meter.score, (int, float))]
@@ -138,15 +120,22 @@ class Actor:
             return round(sum(movie.popcorn_meter.score for movie in tempMovies) / len(tempMovies))
         return round(sum(movie.popcorn_meter.score for movie in self.movies) / len(self.movies))
     def get_starring_movies(self):
-
-        filtered_movies = [
-            movie for movie in self.movies
-            if (data := omdb_api.get_movie_data(movie.title)) 
-            and data['Response'] != 'False'
-            and self.name.lower() in [actor.lower() for actor in data['Actors'].split(', ')]
-        ]
-        return filtered_movies
+        flags = get_billed_flags(self.name, [movie.title for movie in self.movies])
+        return [movie for movie, billed in zip(self.movies, flags) if billed]
     def filter_movies_for_summary(self):
+        db = movie_db.get_db()
+        actor_id = db.actor_id(self.name) if self.stored else None
+        if actor_id is None:
+            return self.filter_movies_for_summary_live()
+        unbilled = db.unbilled_credits(actor_id)
+        if unbilled:
+            # Credits stored before billing was tracked are looked up once
+            flags = get_billed_flags(self.name, [title for _, title in unbilled])
+            db.set_billed(actor_id, {movie_id: billed for (movie_id, _), billed in zip(unbilled, flags) if billed is not None})
+        # Starring character roles, released, with a known box office
+        starring_titles = set(db.starring_titles(actor_id))
+        return [movie for movie in self.movies if movie.title in starring_titles]
+    def filter_movies_for_summary_live(self):
         tempMovies = self.get_starring_movies()
         current_year = datetime.now().year
         # Filter movies to only include those where the actor played a character role
@@ -157,10 +146,16 @@ class Actor:
         tempMovies = [movie for movie in tempMovies if int(movie.year.text) <= current_year]
         return tempMovies
     def get_summary_movies(self, remove_not_starring_roles=True):
+        tempMovies = self.movies
         if remove_not_starring_roles:
             tempMovies = self.filter_movies_for_summary()
-        else:
-            tempMovies = self.movies
+            # Stored actors get their picks from the materialized actor_summary row
+            picks = movie_db.get_db().summary_picks_for_actor(self.name) if self.stored else None
+            if picks is not None:
+                by_title = {}
+                for movie in tempMovies:
+                    by_title.setdefault(movie.title, movie)
+                return [by_title[title] for title in picks if title in by_title]
         
         # Get all summary movies, filtering out None values
         summary_movies = []
@@ -180,39 +175,32 @@ class Actor:
                 continue
             
         return summary_movies
-    def get_actor_summary_image(self):
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            background_image = os.path.join(current_dir, "icons", "film_strip.png")
-            # Load background image
-            background = cv2.imread(background_image)
-            if background is None:
-                raise ValueError(f"Could not load background image from {background_image}")
-                
-            # Get image and text tuples from movie
-            images = [
-                self.get_headshot_tuple(),  # Movie poster image
-                self.get_tomato_meter_Image_tuple(),  # Tomato meter icon
-                self.get_popcorn_meter_Image_tuple()   # Popcorn meter icon
-            ]
-            
-            texts = [
-                self.get_birthdate_tuple(),         # Year text
-                self.get_box_office_tuple(),   # Box office text
-                self.get_age_tuple(),          # Age text
-                self.get_tomato_meter_Text_tuple(),  # Tomato score text
-                self.get_popcorn_meter_Text_tuple()   # Popcorn score text
-            ]
-            
-        # Overlay movie content onto background
-            result = overlay_images_and_text(background, images, texts)
-        
-            return result
+    def get_render_plan(self, background_shape):
+        """Compiles the summary panel (headshot, meters, labels) for backgrounds of `background_shape`."""
+        plan = compile_plan(background_shape, [self.get_headshot_tuple()], [])
+        # Meter icons only depend on the layout and freshness: compiled once per combination
+        plan.extend(static_plan(tuple(background_shape), (
+            self.get_tomato_meter_Image_tuple(),  # Tomato meter icon
+            self.get_popcorn_meter_Image_tuple()   # Popcorn meter icon
+        ), ()))
 
+        texts = [
+            self.get_birthdate_tuple(),         # Year text
+            self.get_box_office_tuple(),   # Box office text
+            self.get_age_tuple(),          # Age text
+            self.get_tomato_meter_Text_tuple(),  # Tomato score text
+            self.get_popcorn_meter_Text_tuple()   # Popcorn score text
+        ]
+        return plan.extend(compile_plan(background_shape, [], texts))
+    def get_actor_summary_image(self, out=None):
+        """Renders the actor panel, into `out` (e.g. a slot of the stitched canvas) when given."""
+        background = film_strip_background()
+        return render_on_background(self.get_render_plan(background.shape), out)
 
-def check_for_odd_names(actor_name):
-    if "dicaprio" in actor_name.lower():
-        return "Leonardo Di Caprio"
-    return actor_name
+def resolve_actor_name(actor_name):
+    """The spelling movies.db uses for an actor ('Leonardo Di Caprio' -> 'Leonardo DiCaprio'), else the input."""
+    match = movie_db.get_db().resolve_actor(actor_name)
+    return match[1] if match else actor_name
 
 def get_headshot_path(actor_name):
     """Get the path to the actor's headshot image"""
@@ -224,10 +212,47 @@ def get_headshot_path(actor_name):
         return os.path.join(current_dir, "icons", "default_headshot.jpg")
     return headshot_path
 
+def get_billed_flags(actor_name, titles):
+    """
+    Whether the actor is on each title's OMDb cast list.
+
+    Returns:
+        list: True/False per title, None where OMDb has no answer
+    """
+    # Resolve every title concurrently; results come back in titles order
+    movie_data = omdb_api.get_movie_data_batch(titles, stage='starring')
+    return [
+        movie_db.is_billed(actor_name, data.get('Actors')) if data and data.get('Response') != 'False' else None
+        for data in movie_data
+    ]
+
+def load_actor_from_db(actor_name):
+    """Builds the actor from movies.db, or returns None if the stored data is missing or stale."""
+    stored = movie_db.get_db().load_actor(actor_name)
+    if stored is None:
+        return None
+    movies = [Movie(title, year, box_office, "", tomatometer, popcornmeter, credit)
+              for title, year, box_office, tomatometer, popcornmeter, credit in stored['movies']]
+    print(f"Loaded {len(movies)} movies for {actor_name} from movies.db")
+    return Actor(
+        actor_name,
+        stored['birthdate'],
+        stored['oscar_wins'],
+        stored['oscar_nominations'],
+        get_headshot_path(actor_name),
+        movies
+    )
+
 def generate_actor_object(actor_name):
     try:
         print(f"Starting to generate actor object for {actor_name}")
-        awards = Wikipedia_scraper.get_actor_awards("Brad Pitt")
+        actor_name = resolve_actor_name(actor_name)
+        # Cassette runs must see every request, so stored actors are scraped again
+        actor = load_actor_from_db(actor_name) if not http_client.cassette_active() else None
+        if actor is not None:
+            return actor
+
+        awards = Wikipedia_scraper.get_actor_awards(actor_name)
         oscar_nominations = awards['nominations']
         oscar_wins = awards['wins']
         movies = scrape_actor_data2(actor_name)
@@ -247,13 +272,19 @@ def generate_actor_object(actor_name):
             get_headshot_path(actor_name),
             movies
         )
-        
-        return actor
-        
     except Exception as e:
         print(f"Failed to generate actor object for {actor_name}: {str(e)}")
         return None
 
+    # A scraped actor is usable even if it cannot be stored; it is scraped again next time
+    try:
+        billed = get_billed_flags(actor_name, [movie.title for movie in movies])
+        movie_db.get_db().save_actor(actor, birthdate, billed)
+    except Exception as e:
+        print(f"Failed to save {actor_name} to movies.db: {str(e)}")
+        actor.stored = False
+    return actor
+
 def parse_birthdate(date_str):
     if isinstance(date_str, datetime.date):
         return date_str.strftime('%B %d, %Y')
@@ -1,8 +1,13 @@
+from functools import lru_cache
+
 import cv2
 import numpy as np
 import os
 
-import requests
+import asset_cache
+import compositing
+import http_client
+import text_render
 
 
 
@@ -37,50 +42,269 @@ class PlaceImageFromURL(PlaceImage):
     def __init__(self, image_url: str, x: int = 0, y: int = 0, width: int = 0, height: int = 0):
         super().__init__(image_url, x, y, width, height)
 
+def place_text(text, style):
+    """PlaceText for `text` drawn with a layout TextStyle."""
+    return PlaceText(text, style.x, style.y, scale=style.scale, color=style.color,
+                     font=style.font, thickness=style.thickness)
+
+def place_image(image_path, rect):
+    """PlaceImage for `image_path` in a layout Rect."""
+    return PlaceImage(image_path, rect.x, rect.y, rect.width, rect.height)
+
+FILM_STRIP_BACKGROUND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons", "film_strip.png")
+
+def film_strip_background():
+    """The decoded film strip frame every panel is drawn on (cached and read-only)."""
+    background = asset_cache.get_cache().get(FILM_STRIP_BACKGROUND)
+    if background is None:
+        raise ValueError(f"Could not load background image from {FILM_STRIP_BACKGROUND}")
+    return background
+
+def render_on_background(plan, out=None):
+    """
+    Draws a compiled panel onto a fresh copy of the film strip background.
+
+    Args:
+        plan: RenderPlan compiled for the background's shape
+        out: writable array of the background's shape to draw into (e.g. a
+             slot of the stitched canvas); a new array when None
+
+    Returns:
+        numpy.ndarray: the rendered panel (out when given)
+    """
+    background = film_strip_background()
+    if out is None:
+        # The cached array is shared; draw on a copy
+        out = background.copy()
+    else:
+        np.copyto(out, background)
+    return plan.execute(out)
+
+def _panel_slots(panel_shape, count, out=None):
+    # One preallocated canvas (or the caller's) and a writable view per panel, top to bottom
+    height = panel_shape[0]
+    shape = (height * count, *panel_shape[1:])
+    if out is None:
+        out = np.empty(shape, dtype=np.uint8)
+    elif out.shape != shape:
+        raise ValueError(f"Canvas for {count} panels must be {shape}, got {out.shape}")
+    return out, [out[i * height:(i + 1) * height] for i in range(count)]
+
+def render_film_strip(panel_renderers, actor_renderer=None, out=None):
+    """
+    Renders panels straight into their slots of the stitched image.
+
+    The actor summary, when given, opens and closes the strip, as
+    stitch_film_strips lays it out. Each renderer is called with out=<slot
+    view> and draws in place, so no panel is rendered to its own array.
+
+    Args:
+        panel_renderers: callables such as Movie.get_movie_image taking out=
+        actor_renderer: callable such as Actor.get_actor_summary_image
+        out: preallocated canvas to render into (e.g. parallel_render.StripCanvas.image)
+
+    Returns:
+        numpy.ndarray: the stitched image (out when given), or None without panels
+    """
+    if not panel_renderers:
+        return None
+    count = len(panel_renderers) + (2 if actor_renderer is not None else 0)
+    result, slots = _panel_slots(film_strip_background().shape, count, out)
+    if actor_renderer is not None:
+        actor_renderer(out=slots[0])
+        np.copyto(slots[-1], slots[0])
+        slots = slots[1:-1]
+    for render, slot in zip(panel_renderers, slots):
+        render(out=slot)
+    return result
+
 def stitch_film_strips(movie_images: list[np.ndarray],actor_image: list[np.ndarray] = None ):
     """
-    Stitches together multiple film strip images vertically with a small overlap
-    
+    Stitches together already rendered film strip images vertically
+
+    render_film_strip renders into the stitched image directly and avoids
+    holding every panel twice; this is for panels that already exist.
+
     Args:
         movie_images: List of film strip images to stitch together
-        
+        actor_image: summary panel placed before and after the movies
+
     Returns:
         Combined image with all strips stitched vertically
     """
     if not movie_images:
         return None
-    total_images = len(movie_images)
+    panels = list(movie_images)
     if actor_image is not None:
-        movie_images.insert(0, actor_image)
-        total_images += 2
-    # Get dimensions from first image
-    height, width = movie_images[0].shape[:2]
-    
-    # Calculate total height needed
-    total_height = height * total_images
-    
-    # Create output image
-    result = np.zeros((total_height, width, 3), dtype=np.uint8)
-    
-    # Place images vertically without overlap
-    y_pos = 0
-    for img in movie_images:
-        result[y_pos:y_pos + height] = img
-        y_pos += height
-    # Add actor image to end if it exists
-    if actor_image is not None:
-        result[y_pos:y_pos + height] = actor_image
+        panels = [actor_image] + panels + [actor_image]
+    result, slots = _panel_slots(panels[0].shape, len(panels))
+    for img, slot in zip(panels, slots):
+        slot[:] = img
     return result
 
+class RenderPlan:
+    """
+    A panel compiled into prepared blits, executed against a background.
+
+    Every image is decoded, resized, clipped and prepared for blending, and
+    every TrueType label rasterized, when the plan is compiled; execute() only
+    runs the blits (and putText for Hershey labels) in the original order.
+    Elements every panel of a layout shares (the meter icons) are compiled once
+    by static_plan and spliced in with extend(); only the poster and labels
+    are compiled per panel.
+    """
+    def __init__(self, shape):
+        self.shape = tuple(shape[:2])
+        # ('blit', (y1, y2, x1, x2), Blit) or ('text', putText arguments)
+        self.steps = []
+
+    def add_blit(self, rect, blit):
+        self.steps.append(('blit', rect, blit))
+
+    def add_text(self, text, x, y, font, scale, color, thickness):
+        self.steps.append(('text', (text, (x, y), font, scale, color, thickness, cv2.LINE_AA)))
+
+    def extend(self, plan):
+        """Appends another plan's steps (which are shared, not copied) after this one's."""
+        if plan.shape != self.shape:
+            raise ValueError(f"Cannot extend a {self.shape} render plan with a {plan.shape} one")
+        self.steps.extend(plan.steps)
+        return self
+
+    def execute(self, background):
+        """
+        Draws the plan onto `background` in place.
+
+        Returns:
+            numpy.ndarray: background
+        """
+        if background is None:
+            print("No background provided, creating new background")
+            return None
+        if tuple(background.shape[:2]) != self.shape:
+            raise ValueError(f"Render plan is for a {self.shape} background, got {background.shape[:2]}")
+        for step in self.steps:
+            if step[0] == 'blit':
+                y1, y2, x1, x2 = step[1]
+                compositing.blend(background[y1:y2, x1:x2], step[2])
+            else:
+                cv2.putText(background, *step[1])
+        return background
+
+
+def _image_blit(image_path, width, height):
+    # Prepared image for a PlaceImage source: a decoded array, a file or a URL
+    if isinstance(image_path, np.ndarray):
+        # Already decoded (e.g. a prefetched poster)
+        img = image_path
+    elif os.path.exists(str(image_path)):
+        # Decoded (alpha included), resized and prepared once per process, then served from the cache
+        return asset_cache.get_cache().get_blit(str(image_path), (width, height), cv2.IMREAD_UNCHANGED)
+    else:
+        # Download image from URL and convert to cv2 format
+        response = http_client.get(str(image_path))
+        img_array = np.asarray(bytearray(response.content), dtype=np.uint8)
+        img = cv2.imdecode(img_array, cv2.IMREAD_UNCHANGED)
+
+    # Resize with validated dimensions
+    if img.shape[1] != width or img.shape[0] != height:
+        img = cv2.resize(img, (width, height))
+    return compositing.prepare(img)
+
+
+def compile_plan(background_shape, image_tuples, text_tuples):
+    """
+    Compiles images and text into a RenderPlan for backgrounds of one shape.
+
+    Args:
+        background_shape: shape of the backgrounds the plan will be drawn on
+        image_tuples: (image_path, x, y, width, height) tuples; image_path may
+                      be a file, a URL or a decoded array
+        text_tuples: (text, x, y, font_scale, color, font, thickness) tuples
+
+    Returns:
+        RenderPlan: the compiled plan
+    """
+    plan = RenderPlan(background_shape)
+    bg_height, bg_width = plan.shape
+
+    for image_path, x, y, width, height in image_tuples:
+        try:
+            # Convert coordinates and dimensions to integers
+            width = int(width)
+            height = int(height)
+            x = int(x)
+            y = int(y)
+
+            # Ensure minimum dimensions
+            if width <= 0 or height <= 0:
+                print(f"Invalid dimensions for image: {width}x{height}")
+                continue
+
+            # Convert coordinates for numpy slicing
+            y1 = max(0, y)
+            y2 = min(bg_height, y + height)
+            x1 = max(0, x)
+            x2 = min(bg_width, x + width)
+            if y2 <= y1 or x2 <= x1:
+                continue
+
+            blit = _image_blit(image_path, width, height)
+            if blit is None:
+                raise ValueError("could not be decoded")
+            # Crop image to match the actual region being modified
+            plan.add_blit((y1, y2, x1, x2), blit.crop(0, 0, y2 - y1, x2 - x1))
+
+        except Exception as e:
+            name = "decoded image" if isinstance(image_path, np.ndarray) else image_path
+            print(f"Error processing image {name}: {str(e)}")
+            continue
+
+    for text, x, y, scale, color, font, thickness in text_tuples:
+        if text is None:
+            continue
+
+        # Convert coordinates and parameters to appropriate types
+        x = int(x)
+        y = int(y)
+        scale = float(scale)
+        thickness = int(thickness)
+        text_str = str(text)
+
+        font = load_font(font)
+        if text_render.is_truetype(font):
+            # TrueType labels are cached sprites blended like any other image
+            placed = text_render.place_text(text_str, x, y, scale, color, font, plan.shape)
+            if placed is not None:
+                plan.add_blit(*placed)
+        else:
+            plan.add_text(text_str, x, y, font, scale, color, thickness)
+
+    return plan
+
+
+@lru_cache(maxsize=64)
+def static_plan(background_shape, image_tuples, text_tuples):
+    """
+    compile_plan for elements that are identical on every panel, compiled once.
+
+    Keyed by the shape and the (hashable) tuples themselves, so a layout
+    change compiles a new plan. Meant for bundled assets such as the meter
+    icons: an edited file is not picked up until the process restarts.
+    Extend a per-panel plan with the result; never add steps to it.
+    """
+    return compile_plan(background_shape, image_tuples, text_tuples)
+
+
 def overlay_images_and_text(background, image_tuples, text_tuples):
         """
         Overlays images and text on background
-        
+
         Args:
             background: Background image array
             images: List of 3 (image_path, x, y, width, height) tuples
             texts: List of 4 (text, x, y, font_scale, color) tuples
-            
+
         Returns:
             Final composited image
         """
@@ -88,94 +312,24 @@ def overlay_images_and_text(background, image_tuples, text_tuples):
         if background is None:
             print("No background provided, creating new background")
             return None
-        
-        # Overlay images
-        for image_path, x, y, width, height in image_tuples:
-            # Convert and validate dimensions
-
-            try:
-                width = int(width)
-                height = int(height)
-                
-                # Ensure minimum dimensions
-                if width <= 0 or height <= 0:
-                    print(f"Invalid dimensions for image {image_path}: {width}x{height}")
-                    continue
-                
-                if os.path.exists(str(image_path)):
-                    img = cv2.imread(str(image_path))
-                else:
-                    # Download image from URL and convert to cv2 format
-                    response = requests.get(str(image_path))
-                    img_array = np.asarray(bytearray(response.content), dtype=np.uint8)
-                    img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-                # Debug print
-                print(f"Resizing image to {width}x{height}")
-                
-                # Resize with validated dimensions
-                img = cv2.resize(img, (width, height))
-                
-                # Convert coordinates and dimensions to integers
-                x = int(x)
-                y = int(y)
-                width = int(width)
-                height = int(height)
-                
-                # Convert coordinates for numpy slicing
-                y1 = max(0, y)
-                y2 = min(background.shape[0], y + height)
-                x1 = max(0, x)
-                x2 = min(background.shape[1], x + width)
-                
-                if y2 > y1 and x2 > x1:
-                    # Crop image to match the actual region being modified
-                    img = img[:(y2-y1), :(x2-x1)]
-                    
-                    # Create mask matching the cropped image dimensions
-                    mask = np.ones(img.shape[:2], dtype=np.float32)
-                    mask = cv2.GaussianBlur(mask, (7,7), 0)
-                    
-                    for c in range(3):
-                        background[y1:y2, x1:x2, c] = (
-                            background[y1:y2, x1:x2, c] * (1 - mask) +
-                            img[:,:,c] * mask
-                        )
-            
-            except Exception as e:
-                print(f"Error processing image {image_path}: {str(e)}")
-                continue
-        
-        # Add text
-        for text, x, y, scale, color, font, thickness in text_tuples:
-            if text is None:
-                continue
-                
-            # Convert coordinates and parameters to appropriate types
-            x = int(x)
-            y = int(y) 
-            scale = float(scale)
-            thickness = int(thickness)
-            
-            # Convert text to string and handle None values
-            text_str = str(text) if text is not None else ""
-            
-            cv2.putText(background, text_str, (x, y), load_font(font), scale, color, thickness, cv2.LINE_AA)
-    
-        return background
+        return compile_plan(background.shape, image_tuples, text_tuples).execute(background)
 
 def load_font(font_path):
+    """The TrueType file to draw with, a cv2 Hershey constant as given, or DUPLEX as a fallback."""
+    if isinstance(font_path, int):
+        return font_path
     # Guard against non-string input
     if not isinstance(font_path, (str, bytes, os.PathLike)):
         print(f"Invalid font_path type: {type(font_path)}")
         return cv2.FONT_HERSHEY_DUPLEX
-        
+
     try:
         font_path = os.path.normpath(str(font_path))
-        if os.path.exists(font_path):
-            return cv2.FONT_HERSHEY_DUPLEX
+        if text_render.is_truetype(font_path):
+            return font_path
         else:
             print(f"Font file not found at: {font_path}")
             return cv2.FONT_HERSHEY_DUPLEX
     except Exception as e:
         print(f"Error loading font: {str(e)}")
-        return cv2.FONT_HERSHEY_DUPLEX
\ No newline at end of file
+        return cv2.FONT_HERSHEY_DUPLEX
@@ -4,8 +4,13 @@ from dotenv import load_dotenv
 import numpy as np
 from VideoManager import VideoManager, CreateInfographicVideo
 import Actor
+import asset_cache
+import layout
+from Movie import prefetch_posters
 import ImageManager
 import Wikipedia_scraper
+import omdb_api
+import parallel_render
 
 def ensure_directories(actor_name):
     # Create all necessary directories
@@ -26,6 +31,8 @@ def main(actor_name):
     
     # Load environment variables
     load_dotenv(override=True)
+    # Validate the layout once up front; every Movie, Actor and Meter shares it
+    layout.get_layout()
     
     # Generate actor object
     actor = Actor.generate_actor_object(actor_name)
@@ -53,16 +60,20 @@ def main(actor_name):
         return
         
     print(f"Processing {len(movies)} movies")
+
+    # Resolve and decode every poster up front so rendering is pure CPU work
+    prefetch_posters(movies)
     
     # Generate and save results
     try:
-        result = ImageManager.stitch_film_strips(
-            [movie.get_movie_image() for movie in movies],
-            actor.get_actor_summary_image()
-        )
-        
-        cv2.imwrite(image_output_path, result)
+        # Panels are drawn straight into their slots of the final image, in
+        # this process unless RENDER_WORKERS asks for a worker pool
+        with parallel_render.StripCanvas(len(movies), with_actor=True) as canvas:
+            result = parallel_render.render_film_strip(movies, actor, canvas)
+            cv2.imwrite(image_output_path, result)
         print(f"Saved image to {image_output_path}")
+        omdb_api.print_usage_metrics()
+        asset_cache.get_cache().print_metrics()
         # return image_output_path, video_output_path
 
         
@@ -1,39 +1,30 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+import asset_cache
 import cv2
-from dotenv import load_dotenv
-from ImageManager import PlaceImage, PlaceText, overlay_images_and_text
+import http_client
+from ImageManager import PlaceImage, PlaceText, compile_plan, film_strip_background, static_plan, place_image, place_text, render_on_background
+from layout import get_layout
 from Meter import Meter, MeterType
+import movie_db
 import omdb_api
+import poster_pack
+import poster_store
+
+LOCAL_POSTER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "posters(1080x1920)")
 
 
 class Movie:
     def __init__(self, name, year, box_office, poster_path, tomatometer:float, popcornmeter:float, credit:str):
-        load_dotenv(override=True)
+        layout = get_layout()
         self.title = name
         self.role = credit
-        self.year = PlaceText(
-            text=year,
-            x=int(os.environ.get('YEAR_X', 0)),
-            y=int(os.environ.get('YEAR_Y', 0)),
-            scale=float(os.environ.get('YEAR_SCALE', 2.4)),
-            color=eval(os.environ.get('TEXT_COLOR_BLACK')),
-            font=os.environ.get('FONT_PATH', cv2.FONT_HERSHEY_SIMPLEX),
-            thickness=int(os.environ.get('YEAR_THICKNESS', 6))
-        )
-        self.box_office = PlaceText(
-            text=box_office,
-            x=int(os.environ.get('BOX_OFFICE_X', 0)),
-            y=int(os.environ.get('BOX_OFFICE_Y', 0)),
-            scale=float(os.environ.get('BOX_OFFICE_SCALE', 1.0)),
-            color=eval(os.environ.get('TEXT_COLOR_GREEN')),
-            font=os.environ.get('FONT_PATH', cv2.FONT_HERSHEY_SIMPLEX),
-            thickness=int(os.environ.get('BOX_OFFICE_THICKNESS', 2))
-        )
-        self.poster = PlaceImage(poster_path, 
-                               x=os.environ.get('POSTER_X'), 
-                               y=os.environ.get('POSTER_Y'),
-                               width=os.environ.get('POSTER_WIDTH'), 
-                               height=os.environ.get('POSTER_HEIGHT'))
+        self.year = place_text(year, layout.year)
+        self.box_office = place_text(box_office, layout.box_office)
+        # As scraped, before it is rounded for display; what movies.db stores
+        self.scraped_box_office = box_office
+        self.poster = place_image(poster_path, layout.poster)
+        self.poster_image = None  # decoded poster, filled in by prefetch_poster()
         self.tomato_meter = Meter(MeterType.TOMATO, tomatometer)
         self.popcorn_meter = Meter(MeterType.POPCORN, popcornmeter)
         self.box_office.text = self.convert_box_office_to_readable()
@@ -58,29 +49,86 @@ class Movie:
                 return f"${value:.0f}"
         except (ValueError, TypeError):
             return self.box_office.text
-    def get_movie_image(self):
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            background_image = os.path.join(current_dir, "icons", "film_strip.png")
-            # Load background image
-            background = cv2.imread(background_image)
-            if background is None:
-                raise ValueError(f"Could not load background image from {background_image}")
+    def resolve_poster_path(self):
+        """Local poster file: the poster store (downloading if needed), else posters(1080x1920)."""
+        # RT, OMDb and file names spell some titles differently; try the stored spelling too
+        titles = [self.title]
+        try:
+            match = movie_db.get_db().resolve_title(self.title, self.year.text)
+        except Exception as e:
+            print(f"Error resolving title {self.title}: {str(e)}")
+            match = None
+        if match and match[1] != self.title:
+            titles.append(match[1])
+        store = poster_store.get_store()
+        # Cassette runs must see every poster request; the bundled posters are part of the checkout
+        for title in titles if not http_client.cassette_active() else []:
+            path = store.get_path(title)
+            if path:
+                return path
+        for title in titles:
+            path = omdb_api.find_local_poster(title, LOCAL_POSTER_DIR)
+            if path:
+                return path
+        try:
+            return store.fetch(self.title)
+        except Exception as e:
+            print(f"Error fetching poster for {self.title}: {str(e)}")
+            return None
+    def prefetch_poster(self):
+        try:
+            if not http_client.cassette_active():
+                self.poster_image = self._fit_poster(poster_pack.get_pack().read_image(self.title))
+        except Exception as e:
+            print(f"Error reading packed poster for {self.title}: {str(e)}")
+        if self.poster_image is not None:
+            return self.poster_image
+        path = self.resolve_poster_path()
+        if path is None:
+            print(f"No local poster for {self.title}, it will be fetched while rendering")
+            return None
+        self.poster.image_path = path
+        # Decoded and resized once per process, within the asset cache's budget
+        self.poster_image = asset_cache.get_cache().get(path, (int(self.poster.width), int(self.poster.height)))
+        if self.poster_image is None:
+            print(f"Could not decode poster {path}")
+        return self.poster_image
+    def _fit_poster(self, image):
+        # Packed posters are resized here, off the render path, so compiling the panel only blits them
+        size = (int(self.poster.width), int(self.poster.height))
+        if image is None or (image.shape[1], image.shape[0]) == size:
+            return image
+        return cv2.resize(image, size)
+    def get_render_plan(self, background_shape):
+        """Compiles the movie panel (poster, meters, labels) for backgrounds of `background_shape`."""
+        if self.poster_image is not None:
+            poster_tuple = (self.poster_image, *self.poster.get_tuple()[1:])
+        else:
             self.poster.image_path = omdb_api.get_poster_url_from_omdb(self.title)
-         # Get image and text tuples from movie
-            images = [
-                self.poster.get_tuple(),  # Movie poster image
-                self.get_tomato_meter_Image_tuple(),  # Tomato meter icon
-                self.get_popcorn_meter_Image_tuple()   # Popcorn meter icon
-            ]
-            
-            texts = [
-                self.year.get_tuple(),         # Year text
-                self.box_office.get_tuple(),   # Box office text
-                self.get_tomato_meter_Text_tuple(),  # Tomato score text
-                self.get_popcorn_meter_Text_tuple()   # Popcorn score text
-            ]
-            
-        # Overlay movie content onto background
-            result = overlay_images_and_text(background, images, texts)
-        
-            return result
+            poster_tuple = self.poster.get_tuple()
+        # Get image and text tuples from movie
+        plan = compile_plan(background_shape, [poster_tuple], [])
+        # Meter icons only depend on the layout and freshness: compiled once per combination
+        plan.extend(static_plan(tuple(background_shape), (
+            self.get_tomato_meter_Image_tuple(),  # Tomato meter icon
+            self.get_popcorn_meter_Image_tuple()   # Popcorn meter icon
+        ), ()))
+
+        texts = [
+            self.year.get_tuple(),         # Year text
+            self.box_office.get_tuple(),   # Box office text
+            self.get_tomato_meter_Text_tuple(),  # Tomato score text
+            self.get_popcorn_meter_Text_tuple()   # Popcorn score text
+        ]
+        return plan.extend(compile_plan(background_shape, [], texts))
+    def get_movie_image(self, out=None):
+        """Renders the movie panel, into `out` (e.g. a slot of the stitched canvas) when given."""
+        background = film_strip_background()
+        return render_on_background(self.get_render_plan(background.shape), out)
+
+def prefetch_posters(movies, max_workers=6):
+    """Resolves and decodes posters for all movies concurrently so rendering never waits on I/O."""
+    if not movies:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(movies))) as executor:
+        list(executor.map(lambda movie: movie.prefetch_poster(), movies))
@@ -1,33 +1,166 @@
-import requests
-from bs4 import BeautifulSoup
+import gzip
+import os
+import threading
+import time
+from functools import cached_property
+import http_client
 from datetime import datetime
 import HelperMethods
 from Movie import Movie
 import omdb_api
+import rt_parsers
 
-def get_actor_url_soup(actor_name):
-        formatted_name = actor_name.lower().replace(' ', '_').replace('.', '').replace("'", "").replace('-','_')
-        url = f'https://www.rottentomatoes.com/celebrity/{formatted_name}'
-    
-    # Fetch the page content
-        response = requests.get(url)
+# Set RT_PAGE_CACHE_DIR to keep downloaded celebrity pages on disk between runs
+PAGE_CACHE_TTL = 7 * 24 * 60 * 60
+
+_actor_pages = {}
+_actor_pages_lock = threading.Lock()
+
+
+def get_actor_url(actor_name):
+    formatted_name = actor_name.lower().replace(' ', '_').replace('.', '').replace("'", "").replace('-','_')
+    return f'https://www.rottentomatoes.com/celebrity/{formatted_name}'
+
+def get_positive_number(value):
+    try:
+        number = float(value)
+        return number if number >= 0 else None
+    except (ValueError, TypeError):
+        return None
+
+
+class ActorPage:
+    """
+    Rotten Tomatoes celebrity page for one actor.
+
+    The page is downloaded and parsed at most once. Everything scraped from it
+    is extracted in that one pass, and the HTML and parse tree are then
+    dropped, so a page kept by get_actor_page() for the lifetime of the
+    process costs only its filmography rows, birthdate and portrait URL.
+    """
+    def __init__(self, actor_name, html=None, parser_backend=None):
+        self.actor_name = actor_name
+        self.url = get_actor_url(actor_name)
+        self.parser_backend = rt_parsers.resolve_backend(
+            parser_backend or os.environ.get('RT_PARSER_BACKEND', rt_parsers.DEFAULT_BACKEND))
+        self._html = html
+
+    def _cache_path(self):
+        cache_dir = os.environ.get('RT_PAGE_CACHE_DIR')
+        if not cache_dir:
+            return None
+        return os.path.join(cache_dir, f"{self.url.rsplit('/', 1)[-1]}.html.gz")
+
+    def _read_cached_html(self):
+        path = self._cache_path()
+        # Cassette runs must see every page request
+        if http_client.cassette_active() or not path or not os.path.exists(path):
+            return None
+        ttl = float(os.environ.get('RT_PAGE_CACHE_TTL', PAGE_CACHE_TTL))
+        if time.time() - os.path.getmtime(path) > ttl:
+            return None
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+
+    def _write_cached_html(self, html):
+        path = self._cache_path()
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                f.write(html)
+        except OSError as e:
+            print(f"Could not cache page for {self.actor_name}: {str(e)}")
+
+    def fetch_html(self):
+        """The page HTML (HTML passed in, the page cache or a download), or None when it can't be fetched."""
+        if self._html is not None:
+            return self._html
+        html = self._read_cached_html()
+        if html is not None:
+            return html
+        response = http_client.get(self.url)
         if response.status_code != 200:
-            print(f"Failed to fetch data for {actor_name}. Status code: {response.status_code}")
-            return None  
-        else:
-            print(f"Successfully fetched data for {actor_name}")
-            return BeautifulSoup(response.text, 'html.parser')
+            print(f"Failed to fetch data for {self.actor_name}. Status code: {response.status_code}")
+            return None
+        print(f"Successfully fetched data for {self.actor_name}")
+        self._write_cached_html(response.text)
+        return response.text
+
+    @cached_property
+    def _fields(self):
+        # (filmography rows, birthday text, portrait URL) from one parse, or None
+        html = self.fetch_html()
+        self._html = None
+        if html is None:
+            return None
+        if self.parser_backend == 'lxml':
+            tree = rt_parsers.parse_tree(html)
+            return (rt_parsers.parse_filmography_lxml(tree),
+                    rt_parsers.find_birthday_text_lxml(tree),
+                    rt_parsers.find_portrait_url_lxml(tree, self.actor_name))
+        soup = rt_parsers.parse_soup(html)
+        return (rt_parsers.parse_filmography_bs4(soup),
+                rt_parsers.find_birthday_text_bs4(soup),
+                rt_parsers.find_portrait_url_bs4(soup, self.actor_name))
+
+    @property
+    def found(self):
+        """Whether the page could be fetched."""
+        return self._fields is not None
+
+    @property
+    def filmography_rows(self):
+        """
+        Raw movie rows from the filmography table as dicts with title, year,
+        tomatometer, box_office, audience_score and credit. Rows after the TV
+        header are left out.
+        """
+        return self._fields[0] if self.found else []
+
+    @cached_property
+    def birthdate(self):
+        if not self.found:
+            return None
+        birthday_text = self._fields[1]
+        if not birthday_text:
+            print(f"Failed to find birthday for {self.actor_name}")
+            return None
+        birthday_text = birthday_text.strip().split(':')[-1].strip()
+        try:
+            return datetime.strptime(birthday_text, '%b %d, %Y').date()
+        except ValueError:
+            print(f"Failed to parse birthday: {birthday_text}")
+            return None
+
+    @property
+    def portrait_url(self):
+        return self._fields[2] if self.found else None
+
+
+def get_actor_page(actor_name):
+    """Returns the shared ActorPage for an actor, creating it on first use."""
+    key = get_actor_url(actor_name)
+    with _actor_pages_lock:
+        page = _actor_pages.get(key)
+        if page is None:
+            page = _actor_pages[key] = ActorPage(actor_name)
+    return page
+
+def get_actor_url_soup(actor_name):
+    # Shared pages keep no parse tree, so this parses a fresh copy
+    html = ActorPage(actor_name).fetch_html()
+    return rt_parsers.parse_soup(html) if html is not None else None
+
 def get_actor_portrait(actor_name):
-    soup = get_actor_url_soup(actor_name)
-    if not soup:
+    page = get_actor_page(actor_name)
+    if not page.found:
         return None
 
-    import os
-    images = soup.find_all('img')
-    portrait_element = soup.find('img', alt=lambda alt: alt and 'portrait photo of' in alt.lower() and actor_name.lower() in alt.lower())
-    if portrait_element:
-        portrait_url = portrait_element['src']
-        response = requests.get(portrait_url)
+    portrait_url = page.portrait_url
+    if portrait_url:
+        response = http_client.get(portrait_url)
         if response.status_code == 200:
             output_folder = 'actor_portraits'
             if not os.path.exists(output_folder):
@@ -44,126 +177,59 @@ def get_actor_portrait(actor_name):
         return None
 
 def get_actor_birthdate(actor_name):
-    # Update or add the birthdate to the actor in the database
-        from datetime import datetime
-        soup=get_actor_url_soup(actor_name)
-
-        birthday_element = soup.find('p', class_='celebrity-bio__item', attrs={'data-qa': 'celebrity-bio-bday'})
-        birthday_text = birthday_element.text.strip().split(':')[-1].strip()
-        try:
-            return datetime.strptime(birthday_text, '%b %d, %Y').date()
-        except ValueError:
-            print(f"Failed to parse birthday: {birthday_text}")
+    return get_actor_page(actor_name).birthdate
 
 def scrape_actor_data(actor_name):
-    # Format the actor name for the URL
-    soup=get_actor_url_soup(actor_name)
-    if not soup:
+    page = get_actor_page(actor_name)
+    if not page.found:
         return None
-#remove tv section
-    tv_section = soup.find('rt-text', string=lambda text: text and text.strip() == 'TV')
-    if tv_section:
-        # Remove everything after the TV section
-        for element in tv_section.find_all_next():
-            element.decompose()
 
     # Scrape movies data
     movies_data = []
-    movie_id = 0
-    for row in soup.select('tr[data-title]'):
-        title = row.select_one('.celebrity-filmography__title a')
-        title = title.text.strip() if title else None
-
-        year_elem = row.select_one('.celebrity-filmography__year')
-        year = year_elem.text.strip() if year_elem else None
-
-        def get_positive_number(value):
-            try:
-                number = float(value)
-                return number if number >= 0 else None
-            except (ValueError, TypeError):
-                return None
-
-        tomatometer_elem = row.select_one('[data-tomatometer]')
-        tomatometer = get_positive_number(tomatometer_elem['data-tomatometer']) if tomatometer_elem else None
-
-        box_office_elem = row.select_one('.celebrity-filmography__box-office')
-        box_office = get_positive_number(box_office_elem.text.strip()) if box_office_elem else None
-
-        audience_score_elem = row.select_one('[data-audiencescore]')
-        popcornmeter = get_positive_number(audience_score_elem['data-audiencescore']) if audience_score_elem else None
-
-        credit_elem = row.select_one('.celebrity-filmography__credits')
-        credit = credit_elem.text.strip() if credit_elem else None
-        
+    for movie_id, row in enumerate(page.filmography_rows):
         movies_data.append([
             movie_id,
-            title,
-            year,
-            box_office,
-            tomatometer,
-            popcornmeter,
-            credit
+            row['title'],
+            row['year'],
+            get_positive_number(row['box_office']),
+            get_positive_number(row['tomatometer']),
+            get_positive_number(row['audience_score']),
+            row['credit']
         ])
-        movie_id += 1
 
     return movies_data
 
 def scrape_actor_data2(actor_name):
-    # Format the actor name for the URL
-    soup=get_actor_url_soup(actor_name)
-    if not soup:
+    page = get_actor_page(actor_name)
+    if not page.found:
         return None
-#remove tv section
-    tv_section = soup.find('rt-text', string=lambda text: text and text.strip() == 'TV')
-    if tv_section:
-        # Remove everything after the TV section
-        for element in tv_section.find_all_next():
-            element.decompose()
 
-    # Scrape movies data
-    movies_data = []
-    for row in soup.select('tr[data-title]'):
-        title = row.select_one('.celebrity-filmography__title a')
-        title = title.text.strip() if title else None
-
-        year_elem = row.select_one('.celebrity-filmography__year')
-        year = year_elem.text.strip() if year_elem else None
-
-        def get_positive_number(value):
-            try:
-                number = float(value)
-                return number if number >= 0 else None
-            except (ValueError, TypeError):
-                return None
-
-        tomatometer_elem = row.select_one('[data-tomatometer]')
-        tomatometer = get_positive_number(tomatometer_elem['data-tomatometer']) if tomatometer_elem else 0
-
-        box_office_elem = row.select_one('.celebrity-filmography__box-office')
-        if box_office_elem:
-            box_office = box_office_elem.text.strip()
+    # Parse every row first; titles whose RT box office is implausibly small
+    # are backfilled from OMDb afterwards in one concurrent batch
+    parsed_rows = []
+    backfill_titles = []
+    for row in page.filmography_rows:
+        title = row['title']
+        # None where RT shows no score: drawn as 0, never stored over a known score
+        tomatometer = get_positive_number(row['tomatometer'])
+        popcornmeter = get_positive_number(row['audience_score'])
+
+        box_office = row['box_office']
+        needs_backfill = False
+        if box_office is not None:
             numeric_box_office = HelperMethods.get_float_from_box_office(box_office)
             if numeric_box_office and numeric_box_office < 1000:
-                box_office = omdb_api.get_box_office_from_omdb(title)
-        else:
-            box_office = None
-
-        audience_score_elem = row.select_one('[data-audiencescore]')
-        popcornmeter = get_positive_number(audience_score_elem['data-audiencescore']) if audience_score_elem else 0
+                needs_backfill = True
+                backfill_titles.append(title)
 
-        credit_elem = row.select_one('.celebrity-filmography__credits')
-        credit = credit_elem.text.strip() if credit_elem else None
+        parsed_rows.append((title, row['year'], box_office, tomatometer, popcornmeter, row['credit'], needs_backfill))
 
-        # Get movie poster path
-        # cleaned_title = title.replace(':', '') if title else ''
-        # poster_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), actor_name, f"{cleaned_title}.jpg")
-        # if not os.path.exists(poster_path):
-        #     print(f"Warning: Could not find poster at {poster_path}")
-        #     poster_path = None
+    backfilled = omdb_api.get_box_office_batch(backfill_titles) if backfill_titles else {}
 
-        # Create Movie object
-        movie_obj = Movie(title, year, box_office, "", tomatometer, popcornmeter,credit)
-        movies_data.append(movie_obj)
+    movies_data = []
+    for title, year, box_office, tomatometer, popcornmeter, credit, needs_backfill in parsed_rows:
+        if needs_backfill:
+            box_office = backfilled.get(title, -1)
+        movies_data.append(Movie(title, year, box_office, "", tomatometer, popcornmeter, credit))
 
-    return movies_data
\ No newline at end of file
+    return movies_data
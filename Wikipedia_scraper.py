@@ -1,7 +1,10 @@
-import requests
-from bs4 import BeautifulSoup
+import http_client
+import movie_db
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+
 def scrape_academy_awards(url):
     """
     Scrapes Academy Award nominations and wins from a Wikipedia awards page.
@@ -15,7 +18,7 @@ def scrape_academy_awards(url):
     """
     try:
         # Get page content
-        response = requests.get(url)
+        response = http_client.get(url)
         response.raise_for_status()
         soup = BeautifulSoup(response.content, 'html.parser')
 
@@ -50,16 +53,85 @@ def scrape_academy_awards(url):
         print(f"Error scraping {url}: {str(e)}")
         return {'nominations': 0, 'wins': 0}
 
+def parse_awards_infobox(html):
+    """
+    Reads Academy Award wins and nominations from the awards infobox.
+
+    Only the infobox sub-tables are parsed; the rest of the page is skipped.
+
+    Returns:
+        dict: {'nominations': n, 'wins': n}, zeros when there is no Academy Awards row
+    """
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('table', class_='infobox-subbox'))
+    awards_table = soup.find('table', class_='infobox-subbox')
+    if not awards_table:
+        return {'nominations': 0, 'wins': 0}
+
+    for row in awards_table.find_all('tr'):
+        if row.find(string=re.compile('Academy Awards')):
+            cells = row.find_all(['td'])
+            if len(cells) >= 2:
+                return {
+                    'wins': int(cells[0].get_text().strip()),
+                    'nominations': int(cells[1].get_text().strip())
+                }
+            break
+    return {'nominations': 0, 'wins': 0}
+
+def fetch_awards_infobox(actor_name):
+    """
+    Fetches only the lead section (which holds the infobox) of the actor's
+    awards page through the MediaWiki parse API.
+
+    Returns:
+        dict: Award counts, or None if the lookup failed and should be retried later
+    """
+    page = f"List_of_awards_and_nominations_received_by_{actor_name.replace(' ', '_')}"
+    params = {
+        'action': 'parse',
+        'page': page,
+        'prop': 'text',
+        'section': 0,
+        'redirects': 1,
+        'format': 'json',
+        'formatversion': 2
+    }
+    try:
+        response = http_client.get(WIKIPEDIA_API_URL, params=params)
+        response.raise_for_status()
+        data = response.json()
+        if 'error' in data:
+            # No awards list page for this actor
+            if data['error'].get('code') == 'missingtitle':
+                return {'nominations': 0, 'wins': 0}
+            print(f"Wikipedia API error for {page}: {data['error'].get('info')}")
+            return None
+        return parse_awards_infobox(data['parse']['text'])
+    except Exception as e:
+        print(f"Error fetching awards for {actor_name}: {str(e)}")
+        return None
+
 def get_actor_awards(actor_name):
     """
     Gets Academy Award stats for an actor from their Wikipedia awards page.
-    
+
+    Results are stored in the actors table of movies.db, so each actor is
+    looked up on Wikipedia only once.
+
     Args:
-        actor_name (str): Name of actor (e.g. "Brad_Pitt")
+        actor_name (str): Name of actor (e.g. "Brad Pitt")
         
     Returns:
         dict: Dictionary with nomination and win counts
     """
-    actor_name = actor_name.replace(" ", "_")
-    url = f"https://en.wikipedia.org/wiki/List_of_awards_and_nominations_received_by_{actor_name}"
-    return scrape_academy_awards(url)
+    actor_name = actor_name.replace("_", " ")
+    # Cassette runs must see the Wikipedia request
+    awards = movie_db.get_db().get_awards(actor_name) if not http_client.cassette_active() else None
+    if awards is not None:
+        return awards
+
+    awards = fetch_awards_infobox(actor_name)
+    if awards is None:
+        return {'nominations': 0, 'wins': 0}
+    movie_db.get_db().save_awards(actor_name, awards)
+    return awards
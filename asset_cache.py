@@ -0,0 +1,144 @@
+import os
+import threading
+from collections import OrderedDict
+
+import cv2
+
+import compositing
+
+# Decoded 1080x1920 posters are ~6MB each; this keeps icons, the film strip
+# background and a few dozen posters resident
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class AssetCache:
+    """
+    Process-wide LRU of decoded images, bounded by total array bytes.
+
+    Entries are keyed by (path, mtime, size, target size, imread flags), so an
+    edited file is decoded again and each target size is resized only once.
+    Cached arrays are read-only; callers that draw on one must copy it first.
+    Prepared blend weights (get_blit) share the same budget.
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, path, size, flags):
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, tuple(size) if size else None, flags)
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def _store(self, key, value, nbytes):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, nbytes)
+                self.current_bytes += nbytes
+                while self.current_bytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self.current_bytes -= evicted
+                    self.evictions += 1
+
+    def get(self, path, size=None, flags=cv2.IMREAD_COLOR):
+        """
+        Decoded image at `path`, resized to `size` (width, height) if given.
+
+        Returns:
+            numpy.ndarray: read-only image, or None when the file is missing or
+                           cannot be decoded
+        """
+        try:
+            key = self._key(path, size, flags)
+        except OSError:
+            return None
+        image = self._lookup(key)
+        if image is not None:
+            return image
+
+        # Decode outside the lock; two threads racing on one key both decode once
+        image = cv2.imread(path, flags)
+        if image is None:
+            return None
+        if size and (image.shape[1], image.shape[0]) != tuple(size):
+            image = cv2.resize(image, tuple(size))
+        image.setflags(write=False)
+        self._store(key, image, image.nbytes)
+        return image
+
+    def get_blit(self, path, size=None, flags=cv2.IMREAD_UNCHANGED):
+        """
+        The image at `path` prepared for compositing.blend.
+
+        Blend weights of translucent images (meter icons) are cached alongside
+        the decoded image; opaque images need none and are prepared per call.
+
+        Returns:
+            compositing.Blit: or None when the file is missing or cannot be decoded
+        """
+        try:
+            key = self._key(path, size, flags) + ('blit',)
+        except OSError:
+            return None
+        blit = self._lookup(key)
+        if blit is not None:
+            return blit
+
+        image = self.get(path, size, flags)
+        if image is None:
+            return None
+        blit = compositing.prepare(image)
+        if blit.weight is not None:
+            self._store(key, blit, blit.weight.nbytes + blit.inverse.nbytes)
+        return blit
+
+    def get_metrics(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+            }
+
+    def print_metrics(self):
+        m = self.get_metrics()
+        print(f"Asset cache: {m['hits']} hits, {m['misses']} misses, {m['evictions']} evictions, "
+              f"{m['entries']} entries ({m['bytes'] / 1024 / 1024:.1f}/{self.max_bytes / 1024 / 1024:.0f} MB)")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Returns the process-wide cache, sized by ASSET_CACHE_MAX_BYTES."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AssetCache(int(os.environ.get('ASSET_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)))
+        return _cache
@@ -0,0 +1,99 @@
+"""
+Time per overlay for the compositing kernel against the original per-channel blend.
+
+Cases use the infographic's panel sizes: a BGR poster and an RGBA meter icon.
+Opaque images must come out byte-identical to the original blend before their
+timings are reported; for RGBA icons the integer path must stay within one
+level of the float path (the original blend ignored alpha).
+
+Usage:
+    python benchmarks/bench_compositing.py [--runs 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import compositing
+
+ICONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "icons")
+
+
+def legacy_blend(region, image):
+    # The loop overlay_images_and_text used before the kernel
+    mask = np.ones(image.shape[:2], dtype=np.float32)
+    mask = cv2.GaussianBlur(mask, (7, 7), 0)
+    for c in range(3):
+        region[:, :, c] = region[:, :, c] * (1 - mask) + image[:, :, c] * mask
+    return region
+
+
+def make_cases():
+    rng = np.random.default_rng(0)
+    poster = rng.integers(0, 256, (1365, 770, 3), dtype=np.uint8)
+    icon = cv2.imread(os.path.join(ICONS_DIR, "FreshTomato.png"), cv2.IMREAD_UNCHANGED)
+    if icon is None:
+        icon = rng.integers(0, 256, (150, 150, 4), dtype=np.uint8)
+    icon = cv2.resize(icon, (150, 150))
+    opaque_icon = icon.copy()
+    opaque_icon[..., 3] = 255
+    return [
+        ("poster 770x1365 BGR", poster, True),
+        ("meter 150x150 BGRA, opaque", opaque_icon, True),
+        ("meter 150x150 BGRA, alpha", icon, False),
+    ]
+
+
+def time_blend(blend, background, image, runs):
+    height, width = image.shape[:2]
+    timings = []
+    for _ in range(runs):
+        target = background.copy()
+        start = time.perf_counter()
+        blend(target[:height, :width], image)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], timings[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    background = rng.integers(0, 256, (1920, 1080, 3), dtype=np.uint8)
+    blends = {
+        'legacy': lambda region, image: legacy_blend(region, image[..., :3]),
+        'float': lambda region, image: compositing.composite(region, image, integer=False),
+        'integer': lambda region, image: compositing.composite(region, image, integer=True),
+    }
+
+    for name, image, opaque in make_cases():
+        height, width = image.shape[:2]
+        results = {}
+        for blend_name, blend in blends.items():
+            target = background.copy()
+            blend(target[:height, :width], image)
+            results[blend_name] = target
+        if opaque:
+            for blend_name in ('float', 'integer'):
+                if not np.array_equal(results[blend_name], results['legacy']):
+                    raise SystemExit(f"{blend_name} output differs from legacy for {name}")
+        else:
+            diff = np.abs(results['integer'].astype(np.int16) - results['float'].astype(np.int16)).max()
+            if diff > 1:
+                raise SystemExit(f"integer and float paths differ by {diff} for {name}")
+
+        print(name)
+        for blend_name, blend in blends.items():
+            median, best = time_blend(blend, background, image, args.runs)
+            print(f"  {blend_name:7s} median {median * 1000:8.3f} ms   best {best * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
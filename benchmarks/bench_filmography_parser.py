@@ -0,0 +1,60 @@
+"""
+Parse time per Rotten Tomatoes celebrity page for each filmography parser backend.
+
+The fixtures in benchmarks/fixtures are saved celebrity pages (synthetic, built
+from the celebrity-filmography markup the scraper reads) with both a Movies and
+a TV table. Every backend must return the same rows for a page before its
+timing is reported.
+
+Usage:
+    python benchmarks/bench_filmography_parser.py [--runs 20]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import rt_parsers
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def parse_page(backend, html):
+    if backend == 'lxml':
+        return rt_parsers.parse_filmography_lxml(rt_parsers.parse_tree(html))
+    return rt_parsers.parse_filmography_bs4(rt_parsers.parse_soup(html))
+
+
+def time_backend(backend, html, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        parse_page(backend, html)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], timings[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "rt_celebrity_*.html"))):
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+
+        reference = parse_page('bs4', html)
+        print(f"{os.path.basename(path)}: {len(html) / 1024:.0f} KB, {len(reference)} movie rows")
+        for backend in rt_parsers.BACKENDS:
+            rows = parse_page(backend, html)
+            if rows != reference:
+                raise SystemExit(f"{backend} rows differ from bs4 for {path}")
+            median, best = time_backend(backend, html, args.runs)
+            print(f"  {backend:5s} median {median * 1000:8.2f} ms   best {best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
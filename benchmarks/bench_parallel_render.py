@@ -0,0 +1,78 @@
+"""
+Wall time of one actor's image step, serial against the process pool.
+
+Builds an actor with synthetic posters (no network), renders the strip with
+ImageManager.render_film_strip and with parallel_render at each worker count,
+into one shared StripCanvas per pool as Main does, and requires byte-identical
+output before reporting timings. The first parallel run of each pool is a warm-up (worker start and asset decoding).
+
+Usage:
+    python benchmarks/bench_parallel_render.py [--movies 5] [--workers 2 4 8 16] [--runs 5]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ImageManager
+import parallel_render
+from Actor import Actor
+from Movie import Movie
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_actor(movie_count):
+    rng = np.random.default_rng(0)
+    movies = []
+    for i in range(movie_count):
+        movie = Movie(f"Movie {i}", str(1990 + i), f"${(i + 1) * 37_500_000:,}", "", 40 + i * 9 % 60, 55 + i * 7 % 45, "Lead")
+        movie.poster_image = rng.integers(0, 256, (int(movie.poster.height), int(movie.poster.width), 3), dtype=np.uint8)
+        movies.append(movie)
+    headshots = os.path.join(BASE_DIR, "headshots")
+    headshot = os.path.join(headshots, sorted(os.listdir(headshots))[0])
+    return Actor("Test Actor", "1970-01-01", 0, 0, headshot, movies)
+
+
+def best_of(render, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        render()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--movies', type=int, default=5)
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8, 16])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    actor = make_actor(args.movies)
+    movies = actor.movies
+
+    def serial():
+        return ImageManager.render_film_strip([movie.get_movie_image for movie in movies], actor.get_actor_summary_image)
+
+    expected = serial()
+    print(f"serial       best {best_of(serial, args.runs) * 1000:8.1f} ms")
+
+    for workers in args.workers:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool, \
+                parallel_render.StripCanvas(len(movies), with_actor=True, shared=True) as canvas:
+            result = parallel_render.render_film_strip(movies, actor, canvas, executor=pool)
+            if not np.array_equal(result, expected):
+                raise SystemExit(f"parallel output with {workers} workers differs from serial")
+            elapsed = best_of(lambda: parallel_render.render_film_strip(movies, actor, canvas, executor=pool), args.runs)
+        print(f"{workers:2d} workers   best {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Time per panel to compile a render plan and to execute it.
+
+The panel is a movie strip frame: a prefetched poster, both meter icons and
+four TrueType labels on the film strip background. Compiling is timed with
+every element compiled (compile_plan) and as Movie.get_render_plan does it,
+with the meter icons taken from static_plan (on the same tuples). Execution is timed separately;
+it is where nearly all of a panel's time goes. Every way must produce the same
+bytes before timings are reported.
+
+Usage:
+    python benchmarks/bench_render_plan.py [--panels 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import asset_cache
+import ImageManager
+from Meter import Meter, MeterType
+from Movie import Movie
+from layout import get_layout
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_panel():
+    layout = get_layout()
+    rng = np.random.default_rng(0)
+    movie = Movie("Benchmark", "2010", "$292,576,195", "", 87, 91, "Lead")
+    movie.poster_image = rng.integers(0, 256, (layout.poster.height, layout.poster.width, 3), dtype=np.uint8)
+    tomato, popcorn = Meter(MeterType.TOMATO, 87), Meter(MeterType.POPCORN, 91)
+    images = [
+        (movie.poster_image, layout.poster.x, layout.poster.y, layout.poster.width, layout.poster.height),
+        tomato.get_image_tuple(),
+        popcorn.get_image_tuple(),
+    ]
+    texts = [
+        movie.year.get_tuple(),
+        movie.box_office.get_tuple(),
+        tomato.get_text_tuple(),
+        popcorn.get_text_tuple(),
+    ]
+    return movie, images, texts
+
+
+def median_ms(run, count):
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--panels', type=int, default=500)
+    args = parser.parse_args()
+
+    background = asset_cache.get_cache().get(os.path.join(BASE_DIR, "icons", "film_strip.png"))
+    movie, images, texts = make_panel()
+
+    compiled = ImageManager.compile_plan(background.shape, images, texts)
+    expected = ImageManager.overlay_images_and_text(background.copy(), images, texts)
+    for name, plan in (('compile_plan', compiled), ('Movie.get_render_plan', movie.get_render_plan(background.shape))):
+        if not np.array_equal(plan.execute(background.copy()), expected):
+            raise SystemExit(f"{name} output differs from overlay_images_and_text")
+
+    compile_all = median_ms(lambda: ImageManager.compile_plan(background.shape, images, texts), args.panels)
+    shape = tuple(background.shape)
+
+    def compile_split():
+        # What Movie.get_render_plan does, on the same prebuilt tuples
+        plan = ImageManager.compile_plan(shape, images[:1], [])
+        plan.extend(ImageManager.static_plan(shape, tuple(images[1:]), ()))
+        return plan.extend(ImageManager.compile_plan(shape, [], texts))
+
+    compile_static = median_ms(compile_split, args.panels)
+    target = background.copy()
+    execute = median_ms(lambda: compiled.execute(target), args.panels)
+    print(f"compile, every element        median {compile_all:7.3f} ms")
+    print(f"compile, static icons cached  median {compile_static:7.3f} ms")
+    print(f"execute                       median {execute:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+"""
+Offline bulk import of film metadata dumps into movies.db.
+
+Supported inputs (plain or .gz):
+    IMDb datasets   title.basics.tsv, title.ratings.tsv, title.principals.tsv, name.basics.tsv
+    OMDb exports    .jsonl (one response per line), .json (array of responses) or .csv
+                    with OMDb field names as the header
+
+Files are streamed row by row and written in batched transactions, so memory
+stays flat no matter how large the dump is. IMDb principals are staged in a
+temporary table and joined in SQL, and only people who appear in an imported
+movie are loaded from name.basics.
+
+Usage:
+    python bulk_import.py title.basics.tsv.gz title.ratings.tsv.gz \
+        title.principals.tsv.gz name.basics.tsv.gz
+    python bulk_import.py --db movies.db omdb_export.jsonl
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import re
+import sys
+import time
+
+import movie_db
+
+BATCH_SIZE = 5000
+# OMDb's Actors field lists the top three billed cast members; IMDb principals
+# within that billing are marked as billed the same way
+BILLED_CAST_SIZE = 3
+
+# IMDb datasets must be loaded in this order: principals need the movies,
+# names are filtered by the staged principals
+IMDB_FILE_ORDER = ['title.basics', 'title.ratings', 'title.principals', 'name.basics']
+
+# Skipped between array elements by iter_json_array
+WHITESPACE = re.compile(r'\s*')
+ARRAY_SEPARATORS = re.compile(r'[\s,]*')
+
+csv.field_size_limit(sys.maxsize)
+
+
+def open_text(path):
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def batched(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def imdb_rows(path):
+    """IMDb TSV rows as dicts with '\\N' turned into None."""
+    with open_text(path) as f:
+        reader = csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE)
+        header = next(reader)
+        for values in reader:
+            yield {key: (None if value == '\\N' else value) for key, value in zip(header, values)}
+
+
+def iter_json_array(f, chunk_size=1 << 20):
+    """Yields the objects of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+    started = False
+    while True:
+        pos = (ARRAY_SEPARATORS if started else WHITESPACE).match(buffer, pos).end()
+        if pos < len(buffer):
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("Expected a JSON array")
+                pos += 1
+                started = True
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                pos = end
+                yield obj
+                continue
+        elif eof:
+            raise ValueError("Unterminated JSON array" if started else "Expected a JSON array")
+        # Decoded objects are only dropped from the buffer here, once per chunk read
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def omdb_rows(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    with open_text(path) as f:
+        if name.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif name.endswith('.json'):
+            yield from iter_json_array(f)
+        elif name.endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            raise ValueError(f"Unsupported OMDb export format: {path}")
+
+
+def none_if_na(value):
+    return None if value in (None, '', 'N/A') else value
+
+
+def float_or_none(value):
+    """'7.8' or '91%' -> float; None for missing or malformed values, so one bad row cannot abort a batch."""
+    try:
+        return float(str(value).strip().rstrip('%')) if value is not None else None
+    except ValueError:
+        return None
+
+
+class BulkImporter:
+    def __init__(self, db_path=movie_db.MOVIES_DB_PATH, batch_size=BATCH_SIZE):
+        self.conn = movie_db.connect(db_path)
+        # The principals staging table and the link sorts can be catalog-sized;
+        # keep them on disk rather than in RAM like the app's connections
+        self.conn.execute("PRAGMA temp_store=FILE")
+        self.conn.execute("PRAGMA foreign_keys=OFF")
+        self.batch_size = batch_size
+        self._genre_ids = {}
+        # name -> id caches for OMDb credits, which only carry names
+        self._actor_ids = {}
+        self._director_ids = {}
+        movie_db.migrate(self.conn)
+        self.conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS import_principals (
+                tconst TEXT NOT NULL,
+                nconst TEXT NOT NULL,
+                ordering INTEGER,
+                category TEXT NOT NULL,
+                characters TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS temp.ix_import_principals_nconst ON import_principals (nconst)")
+
+    def close(self):
+        self.conn.close()
+
+    def _write_batches(self, rows, write, label):
+        start = time.time()
+        count = 0
+        for batch in batched(rows, self.batch_size):
+            with self.conn:
+                write(batch)
+            count += len(batch)
+            print(f"{label}: {count} rows ({count / max(time.time() - start, 1e-6):.0f}/s)", end='\r')
+        print(f"{label}: {count} rows in {time.time() - start:.1f}s")
+        return count
+
+    def genre_id(self, name):
+        if name not in self._genre_ids:
+            self.conn.execute("INSERT OR IGNORE INTO genres (name) VALUES (?)", (name,))
+            self._genre_ids[name] = self.conn.execute("SELECT id FROM genres WHERE name=?", (name,)).fetchone()[0]
+        return self._genre_ids[name]
+
+    def _person_id(self, table, cache, name):
+        # Exact name match, found through the NOCASE name index
+        if name not in cache:
+            row = self.conn.execute(
+                f"SELECT id FROM {table} WHERE name = ?1 COLLATE NOCASE AND name = ?1 LIMIT 1", (name,)).fetchone()
+            if row is None:
+                row = (self.conn.execute(f"INSERT INTO {table} (name) VALUES (?)", (name,)).lastrowid,)
+            cache[name] = row[0]
+        return cache[name]
+
+    def actor_id(self, name):
+        return self._person_id('actors', self._actor_ids, name)
+
+    def director_id(self, name):
+        return self._person_id('directors', self._director_ids, name)
+
+    def _link_genres(self, pairs):
+        # pairs of (imdb_id, "Genre, Genre")
+        self.conn.executemany(
+            "INSERT INTO movie_genre (movie_id, genre_id) "
+            "SELECT m.id, ? FROM movies m WHERE m.imdb_id = ? "
+            "AND NOT EXISTS (SELECT 1 FROM movie_genre g WHERE g.movie_id = m.id AND g.genre_id = ?)",
+            [(gid, imdb_id, gid)
+             for imdb_id, genres in pairs if genres
+             for gid in (self.genre_id(g.strip()) for g in genres.split(',') if g.strip())]
+        )
+
+    def _upsert_movies(self, movies):
+        """
+        movies: dicts with imdb_id, title, year and any of the movies columns.
+
+        Existing titles are kept (RT and OMDb spellings are what scrapes match
+        against) and missing values never overwrite stored ones.
+        """
+        # Adopt rows that were scraped before the dump was imported
+        self.conn.executemany(
+            "UPDATE movies SET imdb_id = :imdb_id WHERE id = ("
+            "  SELECT id FROM movies WHERE imdb_id IS NULL AND title = :title"
+            "  AND (:year IS NULL OR release_date IS NULL OR substr(release_date, -4) = :year) LIMIT 1)"
+            " AND NOT EXISTS (SELECT 1 FROM movies WHERE imdb_id = :imdb_id)",
+            movies
+        )
+        self.conn.executemany(
+            "INSERT INTO movies (imdb_id, title, imdb_score, box_office, release_date, runtime, mpaa_rating, "
+            "                    synopsis, awards, tomato_meter, poster_path) "
+            "VALUES (:imdb_id, :title, :imdb_score, :box_office, :release_date, :runtime, :mpaa_rating, "
+            "        :synopsis, :awards, :tomato_meter, :poster_path) "
+            "ON CONFLICT (imdb_id) DO UPDATE SET "
+            "  imdb_score = COALESCE(excluded.imdb_score, imdb_score), "
+            "  box_office = COALESCE(excluded.box_office, box_office), "
+            # A full date ('22 Nov 2023') replaces a year; a year never replaces anything
+            "  release_date = CASE WHEN length(excluded.release_date) > 4 THEN excluded.release_date "
+            "                      ELSE COALESCE(release_date, excluded.release_date) END, "
+            "  runtime = COALESCE(excluded.runtime, runtime), "
+            "  mpaa_rating = COALESCE(excluded.mpaa_rating, mpaa_rating), "
+            "  synopsis = COALESCE(excluded.synopsis, synopsis), "
+            "  awards = COALESCE(excluded.awards, awards), "
+            "  tomato_meter = COALESCE(excluded.tomato_meter, tomato_meter), "
+            "  poster_path = COALESCE(excluded.poster_path, poster_path)",
+            movies
+        )
+
+    # --- IMDb datasets ---------------------------------------------------
+
+    def import_title_basics(self, path):
+        def movies():
+            for row in imdb_rows(path):
+                if row['titleType'] != 'movie' or row.get('isAdult') == '1':
+                    continue
+                yield {
+                    'imdb_id': row['tconst'],
+                    'title': row['primaryTitle'],
+                    'year': row['startYear'],
+                    # Only the year is known; a stored full date is kept
+                    'release_date': row['startYear'],
+                    'runtime': f"{row['runtimeMinutes']} min" if row['runtimeMinutes'] else None,
+                    'genres': row['genres'],
+                    'imdb_score': None, 'box_office': None, 'mpaa_rating': None, 'synopsis': None,
+                    'awards': None, 'tomato_meter': None, 'poster_path': None,
+                }
+
+        def write(batch):
+            self._upsert_movies(batch)
+            self._link_genres((m['imdb_id'], m['genres']) for m in batch)
+
+        return self._write_batches(movies(), write, "title.basics")
+
+    def import_title_ratings(self, path):
+        def write(batch):
+            self.conn.executemany(
+                "UPDATE movies SET imdb_score = ? WHERE imdb_id = ?",
+                [(float(row['averageRating']), row['tconst']) for row in batch if row['averageRating']]
+            )
+        return self._write_batches(imdb_rows(path), write, "title.ratings")
+
+    def import_title_principals(self, path):
+        wanted = {'actor', 'actress', 'director'}
+
+        def roles(characters):
+            # '["Viv", "Narrator"]' -> 'Viv (Character), Narrator (Character)', matching RT credits
+            if not characters:
+                return None
+            try:
+                names = json.loads(characters)
+            except ValueError:
+                names = [characters]
+            return ', '.join(f"{name} (Character)" for name in names) or None
+
+        def write(batch):
+            # Only keep credits for movies that are in the database
+            self.conn.executemany(
+                "INSERT INTO import_principals (tconst, nconst, ordering, category, characters) "
+                "SELECT ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM movies WHERE imdb_id = ?)",
+                [(row['tconst'], row['nconst'], int(row['ordering'] or 0), row['category'], roles(row['characters']), row['tconst'])
+                 for row in batch if row['category'] in wanted]
+            )
+        return self._write_batches(imdb_rows(path), write, "title.principals")
+
+    def import_name_basics(self, path):
+        def write(batch):
+            people = [{'imdb_id': row['nconst'], 'name': row['primaryName']} for row in batch]
+            for table, categories in (('actors', "('actor', 'actress')"), ('directors', "('director')")):
+                self.conn.executemany(
+                    f"UPDATE {table} SET imdb_id = :imdb_id WHERE id = ("
+                    f"  SELECT id FROM {table} WHERE imdb_id IS NULL AND name = :name LIMIT 1)"
+                    f" AND NOT EXISTS (SELECT 1 FROM {table} WHERE imdb_id = :imdb_id)"
+                    f" AND EXISTS (SELECT 1 FROM import_principals WHERE nconst = :imdb_id AND category IN {categories})",
+                    people
+                )
+                self.conn.executemany(
+                    f"INSERT INTO {table} (imdb_id, name) SELECT :imdb_id, :name "
+                    f"WHERE EXISTS (SELECT 1 FROM import_principals WHERE nconst = :imdb_id AND category IN {categories}) "
+                    f"ON CONFLICT (imdb_id) DO UPDATE SET name = excluded.name",
+                    people
+                )
+        return self._write_batches(imdb_rows(path), write, "name.basics")
+
+    def link_principals(self):
+        """Turns the staged principals into movie_actors rows and movies.director_id."""
+        start = time.time()
+        with self.conn:
+            self.conn.execute("""
+                INSERT OR IGNORE INTO movie_actors (movie_id, actor_id, roles, billed)
+                SELECT m.id, a.id, COALESCE(p.characters, 'Unknown'),
+                       ROW_NUMBER() OVER (PARTITION BY p.tconst ORDER BY p.ordering) <= :billed_cast
+                FROM import_principals p
+                JOIN movies m ON m.imdb_id = p.tconst
+                JOIN actors a ON a.imdb_id = p.nconst
+                WHERE p.category IN ('actor', 'actress')
+                ORDER BY p.tconst, p.ordering
+            """, {'billed_cast': BILLED_CAST_SIZE})
+            self.conn.execute("""
+                UPDATE movies SET director_id = (
+                    SELECT d.id FROM import_principals p JOIN directors d ON d.imdb_id = p.nconst
+                    WHERE p.tconst = movies.imdb_id AND p.category = 'director'
+                    ORDER BY p.ordering LIMIT 1)
+                WHERE director_id IS NULL AND imdb_id IN (
+                    SELECT tconst FROM import_principals WHERE category = 'director')
+            """)
+            self.conn.execute("DELETE FROM import_principals")
+        print(f"Linked principals in {time.time() - start:.1f}s")
+
+    # --- OMDb exports ----------------------------------------------------
+
+    def import_omdb_export(self, path):
+        def movies():
+            for data in omdb_rows(path):
+                if data.get('Response', 'True') != 'True' or not data.get('imdbID') or not data.get('Title'):
+                    continue
+                ratings = data.get('Ratings') or []
+                if isinstance(ratings, str):
+                    try:
+                        ratings = json.loads(ratings) if ratings.startswith('[') else []
+                    except ValueError:
+                        print(f"Skipping {data['imdbID']}: malformed Ratings")
+                        continue
+                tomato = next((r['Value'] for r in ratings if r.get('Source') == 'Rotten Tomatoes'), None)
+                box_office_usd = movie_db.parse_box_office(none_if_na(data.get('BoxOffice')))
+                imdb_rating = none_if_na(data.get('imdbRating'))
+                year = none_if_na(data.get('Year'))
+                yield {
+                    'imdb_id': data['imdbID'],
+                    'title': data['Title'],
+                    'year': year[:4] if year else None,
+                    'release_date': none_if_na(data.get('Released')),
+                    'runtime': none_if_na(data.get('Runtime')),
+                    'imdb_score': float_or_none(imdb_rating),
+                    'box_office': str(box_office_usd) if box_office_usd is not None else None,
+                    'mpaa_rating': data.get('Rated'),
+                    'synopsis': none_if_na(data.get('Plot')),
+                    'awards': data.get('Awards'),
+                    'tomato_meter': float_or_none(tomato),
+                    'poster_path': None,
+                    'genres': none_if_na(data.get('Genre')),
+                    'director': none_if_na(data.get('Director')),
+                    'actors': none_if_na(data.get('Actors')),
+                }
+
+        def write(batch):
+            self._upsert_movies(batch)
+            self._link_genres((m['imdb_id'], m['genres']) for m in batch)
+            directors = [(self.director_id(m['director'].split(',')[0].strip()), m['imdb_id'])
+                         for m in batch if m['director'] and m['director'].split(',')[0].strip()]
+            self.conn.executemany(
+                "UPDATE movies SET director_id = ? WHERE imdb_id = ? AND director_id IS NULL",
+                directors
+            )
+            credits = [(self.actor_id(name.strip()), m['imdb_id'])
+                       for m in batch if m['actors'] for name in m['actors'].split(',') if name.strip()]
+            # The OMDb Actors field is the billing list, so these credits are billed
+            self.conn.executemany(
+                "INSERT INTO movie_actors (movie_id, actor_id, roles, billed) "
+                "SELECT m.id, ?, 'Unknown', 1 FROM movies m WHERE m.imdb_id = ? "
+                "ON CONFLICT (movie_id, actor_id) DO UPDATE SET billed = 1",
+                credits
+            )
+
+        return self._write_batches(movies(), write, os.path.basename(path))
+
+    def import_files(self, paths):
+        imdb_files = {}
+        for path in paths:
+            kind = next((k for k in IMDB_FILE_ORDER if os.path.basename(path).startswith(k)), None)
+            if kind:
+                imdb_files[kind] = path
+            else:
+                self.import_omdb_export(path)
+
+        for kind in IMDB_FILE_ORDER:
+            if kind in imdb_files:
+                getattr(self, f"import_{kind.replace('.', '_')}")(imdb_files[kind])
+        if 'title.principals' in imdb_files:
+            if 'name.basics' not in imdb_files:
+                print("Warning: title.principals without name.basics only links people already in the database")
+            self.link_principals()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import IMDb datasets or OMDb exports into movies.db")
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--db', default=movie_db.MOVIES_DB_PATH)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    importer = BulkImporter(args.db, args.batch_size)
+    try:
+        importer.import_files(args.files)
+    finally:
+        importer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Compositing kernel used by ImageManager.overlay_images_and_text.
+
+Images are blended into a background region with all channels at once. The
+per-pixel weight is the feather mask for the region size (cached) times the
+image's own alpha channel when it has one, so RGBA meter icons keep their
+transparency. Weights are applied with uint16 integer math by default; the
+float path reproduces the original per-channel float blend.
+
+prepare() does the per-image work (alpha split, weights) once so render plans
+can blend the same Blit into many backgrounds with blend().
+"""
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+# Kernel of the GaussianBlur that has always produced the overlay mask
+FEATHER_KSIZE = (7, 7)
+
+
+@lru_cache(maxsize=128)
+def feather_mask(height, width):
+    """float32 weights in [0, 1] for a height x width overlay (read-only, cached per size)."""
+    mask = cv2.GaussianBlur(np.ones((height, width), dtype=np.float32), FEATHER_KSIZE, 0)
+    mask.setflags(write=False)
+    return mask
+
+
+@lru_cache(maxsize=128)
+def feather_mask_u8(height, width):
+    """feather_mask scaled to 0-255 for the integer path."""
+    mask = np.rint(feather_mask(height, width) * 255).astype(np.uint8)
+    mask.setflags(write=False)
+    return mask
+
+
+@lru_cache(maxsize=128)
+def feather_is_opaque(height, width):
+    # A blurred block of ones stays 1.0 everywhere with reflected borders, so
+    # unless the kernel changes every mask is opaque and blending is a copy
+    return bool(feather_mask(height, width).min() >= 1.0)
+
+
+def split_alpha(image):
+    """(BGR, alpha or None) for a grayscale, BGR or BGRA image."""
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR), None
+    if image.shape[2] == 4:
+        return image[..., :3], image[..., 3]
+    return image, None
+
+
+def _div255(values):
+    # round(values / 255) for uint16 values <= 255*255, in place: (t + (t >> 8)) >> 8 with t = values + 128
+    values += 128
+    values += values >> 8
+    values >>= 8
+    return values
+
+
+class Blit:
+    """
+    An image prepared for blending: its BGR pixels and per-value weights.
+
+    weight is None for opaque images (blending is a copy); otherwise it is a
+    contiguous HxWx3 uint16 array in 0-255 (integer) or float32 in [0, 1].
+    Preparing once and blending many times is what render plans rely on.
+    """
+    __slots__ = ('color', 'weight', 'inverse')
+
+    def __init__(self, color, weight=None, inverse=None):
+        self.color = color
+        self.weight = weight
+        self.inverse = inverse
+
+    @property
+    def shape(self):
+        return self.color.shape[:2]
+
+    def crop(self, top, left, height, width):
+        """The part of the blit that lands inside a clipped region."""
+        if (top, left, height, width) == (0, 0, *self.shape):
+            return self
+        rows, cols = slice(top, top + height), slice(left, left + width)
+        if self.weight is None:
+            return Blit(self.color[rows, cols])
+        # Feather masks are opaque everywhere (see feather_is_opaque), so
+        # cropped weights are the weights the crop would have been given
+        return Blit(self.color[rows, cols], self.weight[rows, cols], self.inverse[rows, cols])
+
+
+def prepare(image, integer=True):
+    """
+    Works out the blend weights for `image` once.
+
+    Args:
+        image: uint8 HxW, HxWx3 or HxWx4 array, already cropped to the region
+        integer: use uint16 fixed-point weights instead of float math
+
+    Returns:
+        Blit: the prepared image
+    """
+    height, width = image.shape[:2]
+    color, alpha = split_alpha(image)
+
+    if feather_is_opaque(height, width) and (alpha is None or alpha.min() == 255):
+        return Blit(color)
+
+    if integer:
+        weight = feather_mask_u8(height, width).astype(np.uint16)
+        if alpha is not None:
+            weight *= alpha
+            weight = _div255(weight)
+        # One contiguous weight per channel value; broadcasting over a strided
+        # channel axis is several times slower
+        weight = cv2.merge([weight, weight, weight])
+        return Blit(color, weight, 255 - weight)
+
+    weight = feather_mask(height, width)
+    if alpha is not None:
+        weight = weight * (alpha.astype(np.float32) / 255)
+    weight = cv2.merge([weight, weight, weight])
+    return Blit(color, weight, 1 - weight)
+
+
+def blend(region, blit):
+    """
+    Blends a prepared image into `region` (a BGR view of the background) in place.
+
+    Returns:
+        numpy.ndarray: region
+    """
+    if blit.weight is None:
+        np.copyto(region, blit.color)
+    elif blit.weight.dtype == np.uint16:
+        # color*w + bg*(255-w) <= 255*255, so uint16 cannot overflow
+        blended = blit.color.astype(np.uint16)
+        blended *= blit.weight
+        background = region.astype(np.uint16)
+        background *= blit.inverse
+        blended += background
+        np.copyto(region, _div255(blended), casting='unsafe')
+    else:
+        # Truncating cast, as assigning the float blend into the uint8 background did
+        np.copyto(region, region * blit.inverse + blit.color * blit.weight, casting='unsafe')
+    return region
+
+
+def composite(region, image, integer=True):
+    """
+    Blends `image` into `region` (a BGR view of the background) in place.
+
+    Args:
+        region: uint8 HxWx3 array, usually a slice of the background
+        image: uint8 HxW, HxWx3 or HxWx4 array of the same height and width
+        integer: use uint16 fixed-point weights instead of float math
+
+    Returns:
+        numpy.ndarray: region
+    """
+    return blend(region, prepare(image, integer))
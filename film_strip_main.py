@@ -7,6 +7,7 @@ from VideoManager import DEBUG
 from film_strip_generator import FilmStripWidget
 from Film_Strip import FilmStrip, Ui_Form
 from models import noDB_actor
+import omdb_api
 from single_actor_full import generate_actor_object
 from video_manager import VideoManager
 from pydub import AudioSegment
@@ -134,7 +135,7 @@ def create_actor_posters(actor:noDB_actor):
     film_strip_components = []
     for movie, soundbite in poster_movies:
         try:
-            main_img = os.path.join(actor.name, f"{movie.title.replace(' ', '_').replace('/', '_').replace('?', '').replace(':', '')}.jpg")
+            main_img = omdb_api.find_local_poster(movie.title, actor.name) or os.path.join(actor.name, omdb_api.poster_filename(movie.title))
             # strip = FilmStrip.UiForm()
             # Create FilmStrip instance without showing it
             strip = FilmStrip(
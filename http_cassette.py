@@ -0,0 +1,132 @@
+import atexit
+import base64
+import gzip
+import json
+import os
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CASSETTE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes", "default.json.gz")
+
+# Query parameters that never take part in matching and are never written to disk
+IGNORED_PARAMS = {'apikey'}
+
+
+class CassetteMissError(requests.exceptions.ConnectionError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class Cassette:
+    """
+    Gzipped store of HTTP responses keyed by method, URL and query parameters.
+
+    In "record" mode responses from the real network are captured and written
+    back when the process exits (or save() is called). In "replay" mode
+    requests are answered only from the cassette.
+
+    While a cassette is active the local caches that would otherwise answer
+    without a request (OMDb responses, RT pages, the poster store and pack,
+    actors and awards in movies.db) are bypassed, so a recording made on a
+    warm machine replays on a clean checkout.
+    """
+    def __init__(self, path=DEFAULT_CASSETTE_PATH, mode='replay'):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.entries = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self.load()
+        elif mode == 'replay':
+            raise FileNotFoundError(f"Cassette not found: {path}")
+
+    @staticmethod
+    def make_key(method, url, params=None):
+        params = {k: v for k, v in (params or {}).items() if k not in IGNORED_PARAMS and v is not None}
+        query = urlencode(sorted((str(k), str(v)) for k, v in params.items()))
+        return f"{method.upper()} {url}?{query}" if query else f"{method.upper()} {url}"
+
+    @staticmethod
+    def redact_url(url):
+        """The URL without IGNORED_PARAMS in its query string."""
+        parts = urlsplit(url)
+        query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in IGNORED_PARAMS]
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    def load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            self.entries = json.load(f)
+
+    def save(self):
+        with self._lock:
+            if not self.dirty:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            self.dirty = False
+        print(f"Saved {len(self.entries)} responses to cassette {self.path}")
+
+    def record(self, method, url, params, response):
+        entry = {
+            'status_code': response.status_code,
+            'url': self.redact_url(response.url),
+            'headers': {'Content-Type': response.headers.get('Content-Type', '')},
+            'body': base64.b64encode(response.content).decode('ascii'),
+        }
+        with self._lock:
+            self.entries[self.make_key(method, url, params)] = entry
+            self.dirty = True
+
+    def play(self, method, url, params=None):
+        key = self.make_key(method, url, params)
+        entry = self.entries.get(key)
+        if entry is None:
+            raise CassetteMissError(f"No recorded response for {key}")
+        response = requests.Response()
+        response.status_code = entry['status_code']
+        response.url = entry['url']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = base64.b64decode(entry['body'])
+        return response
+
+
+_cassette = None
+_cassette_loaded = False
+_cassette_lock = threading.Lock()
+
+
+def get_cassette():
+    """
+    Returns the process-wide cassette selected by HTTP_CASSETTE_MODE
+    ("record" or "replay") and HTTP_CASSETTE_PATH, or None when off.
+    """
+    global _cassette, _cassette_loaded
+    with _cassette_lock:
+        if not _cassette_loaded:
+            mode = os.environ.get('HTTP_CASSETTE_MODE', '').strip().lower()
+            if mode in ('record', 'replay'):
+                _cassette = Cassette(os.environ.get('HTTP_CASSETTE_PATH', DEFAULT_CASSETTE_PATH), mode)
+                if mode == 'record':
+                    atexit.register(_cassette.save)
+            _cassette_loaded = True
+        return _cassette
+
+
+def use_cassette(path, mode):
+    """Switches the process to a cassette explicitly (mode None turns it off)."""
+    global _cassette, _cassette_loaded
+    with _cassette_lock:
+        if _cassette is not None and _cassette.mode == 'record':
+            _cassette.save()
+        _cassette = Cassette(path, mode) if mode else None
+        if _cassette is not None and mode == 'record':
+            atexit.register(_cassette.save)
+        _cassette_loaded = True
+        return _cassette
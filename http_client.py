@@ -0,0 +1,116 @@
+import os
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import http_cassette
+
+# Number of per-host connection pools kept alive and connections per pool
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 32
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 20)
+HOST_TIMEOUTS = {
+    'www.omdbapi.com': (5, 10),
+    'www.rottentomatoes.com': (5, 20),
+    'en.wikipedia.org': (5, 15),
+    'm.media-amazon.com': (5, 30),
+}
+
+USER_AGENT = "YT-Actor-Summary/1.0 (python-requests)"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_retry_policy():
+    """Retry policy shared by every host: 5 tries with 1, 2, 4, 8, 16 second backoff."""
+    return Retry(
+        total=5,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+
+def create_session(pool_connections=None, pool_maxsize=None):
+    """
+    Builds a requests.Session whose adapters keep a keep-alive pool per host.
+
+    Args:
+        pool_connections (int): Number of host pools to keep (HTTP_POOL_CONNECTIONS)
+        pool_maxsize (int): Connections kept per host (HTTP_POOL_MAXSIZE)
+
+    Returns:
+        requests.Session: Session with the shared retry policy mounted
+    """
+    if pool_connections is None:
+        pool_connections = int(os.environ.get('HTTP_POOL_CONNECTIONS', POOL_CONNECTIONS))
+    if pool_maxsize is None:
+        pool_maxsize = int(os.environ.get('HTTP_POOL_MAXSIZE', POOL_MAXSIZE))
+
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=create_retry_policy()
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """Returns the process-wide session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def reset_session():
+    """Closes the shared session so the next request builds a new one (e.g. after changing pool sizes)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_timeout(url):
+    return HOST_TIMEOUTS.get(urlparse(url).netloc, DEFAULT_TIMEOUT)
+
+
+def cassette_active():
+    return http_cassette.get_cassette() is not None
+
+
+def cassette_replaying():
+    cassette = http_cassette.get_cassette()
+    return cassette is not None and cassette.mode == 'replay'
+
+
+def get(url, params=None, timeout=None, **kwargs):
+    """
+    requests.get through the shared pooled session with the host's timeout.
+
+    When HTTP_CASSETTE_MODE is "replay" the response comes from the cassette
+    instead of the network; in "record" mode every response is captured.
+    """
+    cassette = http_cassette.get_cassette()
+    if cassette is not None and cassette.mode == 'replay':
+        return cassette.play('GET', url, params)
+    if timeout is None:
+        timeout = get_timeout(url)
+    response = get_session().get(url, params=params, timeout=timeout, **kwargs)
+    if cassette is not None:
+        cassette.record('GET', url, params, response)
+    return response
@@ -0,0 +1,226 @@
+"""
+Infographic layout: where every poster, icon and label goes and how it looks.
+
+The layout is read once from config.py, overridden by the environment and
+.env (.env wins, as load_dotenv(override=True) always did), validated, and
+shared by every Movie, Actor and Meter as a frozen object. Preview sessions
+that edit .env call reload_if_changed() before re-rendering.
+"""
+import ast
+import os
+import threading
+from dataclasses import dataclass
+
+import cv2
+from dotenv import dotenv_values, find_dotenv
+
+try:
+    import config
+except ImportError:  # a checkout with only config.example.py
+    config = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Score labels have always asked for the bundled face
+BUNDLED_FONT = os.path.join("fonts", "RozhaOne-Regular.ttf")
+
+
+@dataclass(frozen=True)
+class Rect:
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+@dataclass(frozen=True)
+class TextStyle:
+    x: int
+    y: int
+    scale: float
+    color: tuple
+    thickness: int
+    font: object
+
+
+@dataclass(frozen=True)
+class Layout:
+    font_path: str
+    poster: Rect
+    tomato_meter: Rect
+    popcorn_meter: Rect
+    year: TextStyle
+    box_office: TextStyle
+    actor_box_office: TextStyle
+    birthdate: TextStyle
+    age: TextStyle
+    # Score labels are centred under their meter; x is worked out per label
+    score: TextStyle
+
+    def meter(self, is_tomato):
+        return self.tomato_meter if is_tomato else self.popcorn_meter
+
+
+class _Settings:
+    """Looks keys up in .env, then the environment, then config.py, then a default."""
+    def __init__(self, dotenv):
+        self.dotenv = dotenv
+
+    def raw(self, key, config_name=None, default=None):
+        if self.dotenv.get(key) is not None:
+            return self.dotenv[key]
+        if os.environ.get(key) is not None:
+            return os.environ[key]
+        value = getattr(config, config_name or key, None)
+        return default if value is None else value
+
+    def int(self, key, config_name=None, default=0, minimum=None):
+        value = self.raw(key, config_name, default)
+        try:
+            value = int(float(value))
+        except (TypeError, ValueError):
+            raise ValueError(f"Layout setting {key} must be a number, got {value!r}")
+        if minimum is not None and value < minimum:
+            raise ValueError(f"Layout setting {key} must be at least {minimum}, got {value}")
+        return value
+
+    def float(self, key, config_name=None, default=1.0):
+        value = self.raw(key, config_name, default)
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Layout setting {key} must be a number, got {value!r}")
+        if value <= 0:
+            raise ValueError(f"Layout setting {key} must be positive, got {value}")
+        return value
+
+    def color(self, key, default):
+        value = self.raw(key, default=default)
+        if isinstance(value, str):
+            try:
+                value = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                raise ValueError(f"Layout setting {key} must be a (B, G, R) tuple, got {value!r}")
+        if (not isinstance(value, (tuple, list)) or len(value) != 3
+                or not all(isinstance(c, int) and 0 <= c <= 255 for c in value)):
+            raise ValueError(f"Layout setting {key} must be three integers in 0-255, got {value!r}")
+        return tuple(value)
+
+    def rect(self, prefix, x_key=None):
+        return Rect(x=self.int(x_key or f'{prefix}_X'),
+                    y=self.int(f'{prefix}_Y'),
+                    width=self.int(f'{prefix}_WIDTH', minimum=1),
+                    height=self.int(f'{prefix}_HEIGHT', minimum=1))
+
+
+def hershey_font(name):
+    """cv2 font constant for a name such as "cv2.FONT_HERSHEY_SIMPLEX"."""
+    font = getattr(cv2, str(name).split('.')[-1], None)
+    if not isinstance(font, int):
+        raise ValueError(f"Unknown OpenCV font {name!r}")
+    return font
+
+
+def _resolve_font(path):
+    # Relative font paths work from the repo as well as the working directory
+    if not path:
+        return None
+    for candidate in (path, os.path.join(BASE_DIR, path)):
+        if os.path.isfile(candidate):
+            return os.path.abspath(candidate)
+    print(f"Font file not found at: {path}")
+    return None
+
+
+def load_layout(dotenv_path=None):
+    """
+    Builds and validates a Layout from config.py, the environment and .env.
+
+    Args:
+        dotenv_path: .env file to read; defaults to the one load_dotenv finds
+
+    Returns:
+        Layout: the validated layout
+
+    Raises:
+        ValueError: when a setting is missing, malformed or out of range
+    """
+    dotenv_path = dotenv_path if dotenv_path is not None else find_dotenv(usecwd=True)
+    settings = _Settings(dotenv_values(dotenv_path) if dotenv_path else {})
+
+    # Text without a FONT_PATH has always been drawn with the default Hershey face
+    default_font = hershey_font(settings.raw('DEFAULT_FONT', default='cv2.FONT_HERSHEY_SIMPLEX'))
+    font_path = _resolve_font(settings.raw('FONT_PATH'))
+    text_font = font_path or default_font
+    black = settings.color('TEXT_COLOR_BLACK', (0, 0, 0))
+    green = settings.color('TEXT_COLOR_GREEN', (0, 255, 0))
+
+    def text(prefix, color, scale, thickness, config_prefix=None):
+        config_prefix = config_prefix or prefix
+        return TextStyle(x=settings.int(f'{prefix}_X', f'{config_prefix}_X'),
+                         y=settings.int(f'{prefix}_Y', f'{config_prefix}_Y'),
+                         scale=settings.float(f'{prefix}_SCALE', f'{config_prefix}_SCALE', scale),
+                         color=color,
+                         thickness=settings.int(f'{prefix}_THICKNESS', f'{config_prefix}_THICKNESS', thickness, minimum=1),
+                         font=text_font)
+
+    box_office = text('BOX_OFFICE', green, 1.0, 2)
+    return Layout(
+        font_path=font_path,
+        poster=settings.rect('POSTER'),
+        tomato_meter=settings.rect('METER', 'TOMATO_METER_X'),
+        popcorn_meter=settings.rect('METER', 'POPCORN_METER_X'),
+        year=text('YEAR', black, 2.4, 6),
+        box_office=box_office,
+        actor_box_office=TextStyle(x=box_office.x, y=box_office.y,
+                                   scale=settings.float('ACTOR_BOX_OFFICE_SCALE', default=1.0),
+                                   color=green,
+                                   thickness=settings.int('ACTOR_BOX_OFFICE_THICKNESS', default=2, minimum=1),
+                                   font=text_font),
+        birthdate=text('BIRTHDATE', black, 2.4, 6),
+        age=text('AGE', black, 1.0, 2, config_prefix='ACTOR_AGE'),
+        score=TextStyle(x=0,
+                        y=settings.int('SCORE_Y'),
+                        scale=settings.float('SCORE_SCALE', default=4.0),
+                        color=settings.color('TEXT_COLOR_WHITE', (255, 255, 255)),
+                        thickness=settings.int('SCORE_THICKNESS', default=15, minimum=1),
+                        font=font_path or _resolve_font(BUNDLED_FONT) or default_font),
+    )
+
+
+_layout = None
+_layout_mtime = None
+_layout_lock = threading.Lock()
+
+
+def _dotenv_mtime():
+    path = find_dotenv(usecwd=True)
+    try:
+        return os.stat(path).st_mtime_ns if path else None
+    except OSError:
+        return None
+
+
+def get_layout():
+    """Returns the process-wide layout, loading it on first use."""
+    global _layout, _layout_mtime
+    with _layout_lock:
+        if _layout is None:
+            _layout_mtime = _dotenv_mtime()
+            _layout = load_layout()
+        return _layout
+
+
+def reload_layout():
+    """Re-reads the layout; objects built afterwards use the new one."""
+    global _layout, _layout_mtime
+    with _layout_lock:
+        _layout_mtime = _dotenv_mtime()
+        _layout = load_layout()
+        return _layout
+
+
+def reload_if_changed():
+    """Reloads the layout when .env has changed since it was read (for preview sessions)."""
+    with _layout_lock:
+        changed = _layout is None or _dotenv_mtime() != _layout_mtime
+    return reload_layout() if changed else get_layout()
@@ -1,5 +1,6 @@
 import os
 import numerize
+import omdb_api
 from numerize import numerize as n
 
 def numerize_value(value):
@@ -208,5 +209,5 @@ class Movie:
 def convert_to_movie_object(movie: noDB_movie,current_dir: str):
     Tmeter = Meter(MeterType.TOMATO, movie.tomatometer)
     Pmeter = Meter(MeterType.POPCORN, movie.popcornmeter)
-    poster_path = os.path.join(current_dir, f"{movie.title.replace(' ', '_')}.jpg")
+    poster_path = omdb_api.find_local_poster(movie.title, current_dir) or os.path.join(current_dir, f"{movie.title.replace(' ', '_')}.jpg")
     return Movie(movie.title, poster_path, Tmeter, Pmeter, movie.year, movie.box_office)
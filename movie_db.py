@@ -0,0 +1,824 @@
+"""
+Data access layer for movies.db.
+
+One write connection (serialized by a lock) and a small pool of read-only
+connections for concurrent workers, all in WAL mode. SQL lives in module
+constants so sqlite3's per-connection statement cache reuses the prepared
+statements. Schema changes are applied by migrate() and tracked with
+PRAGMA user_version.
+"""
+import difflib
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from datetime import datetime
+
+MOVIES_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "movies.db")
+READ_POOL_SIZE = 4
+STATEMENT_CACHE_SIZE = 256
+# Scraped actor data older than this is refreshed from Rotten Tomatoes
+ACTOR_MAX_AGE = 7 * 24 * 60 * 60
+
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+# Minimum similarity between normalized names for the resolver to accept a match
+RESOLVE_THRESHOLD = 0.88
+RESOLVE_CANDIDATES = 20
+RESOLVE_MEMO_SIZE = 10000
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+def _add_column(conn, table, column, definition):
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _execute_script(conn, script):
+    # executescript() commits first and runs outside the caller's transaction;
+    # migrations run statement by statement so a failure rolls back all of it
+    statement = ''
+    for part in script.split(';'):
+        statement += part + ';'
+        if sqlite3.complete_statement(statement):
+            if statement.strip(' \n;'):
+                conn.execute(statement)
+            statement = ''
+    if statement.strip(' \n;'):
+        raise ValueError(f"Incomplete SQL statement in migration: {statement.strip()}")
+
+
+def _migration_1(conn):
+    # imdb_id keys for bulk imports, scrape bookkeeping for refreshes
+    for table in ('movies', 'actors', 'directors'):
+        _add_column(conn, table, 'imdb_id', 'VARCHAR(20)')
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_imdb_id ON {table} (imdb_id)")
+    _add_column(conn, 'actors', 'scraped_at', 'FLOAT')
+    # Position in the actor's last scraped filmography; NULL for imported credits
+    _add_column(conn, 'movie_actors', 'credit_order', 'INTEGER')
+
+
+# box_office is text like '37562568.0' ('-1' when unknown) and release_date is
+# either an OMDb date ('15 Oct 1999') or a bare year
+BOX_OFFICE_USD_EXPR = "CASE WHEN CAST(box_office AS REAL) > 0 THEN CAST(CAST(box_office AS REAL) AS INTEGER) END"
+RELEASE_YEAR_EXPR = (
+    "CASE WHEN substr(release_date, -4) GLOB '[0-9][0-9][0-9][0-9]' "
+    "THEN CAST(substr(release_date, -4) AS INTEGER) END"
+)
+
+
+def _migration_2(conn):
+    # Numeric columns and indexes for the summary picks. They are generated from
+    # the text columns, so every writer (scraper, bulk import, older scripts)
+    # stays consistent without a second write per row; the indexes store them.
+    _add_column(conn, 'movies', 'box_office_usd', f"INTEGER GENERATED ALWAYS AS ({BOX_OFFICE_USD_EXPR}) VIRTUAL")
+    _add_column(conn, 'movies', 'release_year', f"INTEGER GENERATED ALWAYS AS ({RELEASE_YEAR_EXPR}) VIRTUAL")
+    _execute_script(conn, """
+        CREATE INDEX IF NOT EXISTS ix_movies_title ON movies (title);
+        CREATE INDEX IF NOT EXISTS ix_actors_name ON actors (name COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS ix_movie_actors_actor ON movie_actors (actor_id, movie_id, credit_order);
+        CREATE INDEX IF NOT EXISTS ix_movies_tomato_meter ON movies (tomato_meter, release_year, box_office_usd);
+        CREATE INDEX IF NOT EXISTS ix_movies_popcorn_meter ON movies (popcorn_meter, release_year, box_office_usd);
+        CREATE INDEX IF NOT EXISTS ix_movies_box_office_usd ON movies (box_office_usd, release_year);
+    """)
+
+
+def _migration_3(conn):
+    # Materialized summary per actor. Triggers flag an actor dirty whenever its
+    # credits or the scores of one of its movies actually change (rewriting the
+    # same values flags nothing); refresh_summaries() recomputes only the
+    # flagged rows.
+    _execute_script(conn, """
+        CREATE TABLE IF NOT EXISTS actor_summary (
+            actor_id INTEGER PRIMARY KEY REFERENCES actors (id),
+            top_tomato_movie_id INTEGER,
+            top_popcorn_movie_id INTEGER,
+            top_gross_movie_id INTEGER,
+            low_tomato_movie_id INTEGER,
+            low_popcorn_movie_id INTEGER,
+            avg_tomato FLOAT,
+            avg_popcorn FLOAT,
+            total_box_office_usd INTEGER,
+            movie_count INTEGER,
+            eligible_count INTEGER,
+            dirty INTEGER NOT NULL DEFAULT 1,
+            refreshed_at FLOAT,
+            published_at FLOAT
+        );
+        INSERT OR IGNORE INTO actor_summary (actor_id) SELECT id FROM actors;
+        CREATE INDEX IF NOT EXISTS ix_actor_summary_dirty ON actor_summary (actor_id) WHERE dirty = 1;
+        CREATE INDEX IF NOT EXISTS ix_actor_summary_next ON actor_summary (total_box_office_usd DESC, eligible_count)
+            WHERE dirty = 0 AND published_at IS NULL;
+
+        CREATE TRIGGER IF NOT EXISTS tr_actors_summary_insert AFTER INSERT ON actors
+        BEGIN
+            INSERT OR IGNORE INTO actor_summary (actor_id) VALUES (NEW.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tr_actors_summary_delete AFTER DELETE ON actors
+        BEGIN
+            DELETE FROM actor_summary WHERE actor_id = OLD.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS tr_movie_actors_summary_insert AFTER INSERT ON movie_actors
+        BEGIN
+            UPDATE actor_summary SET dirty = 1 WHERE actor_id = NEW.actor_id AND dirty = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS tr_movie_actors_summary_update AFTER UPDATE ON movie_actors
+            WHEN OLD.actor_id IS NOT NEW.actor_id OR OLD.movie_id IS NOT NEW.movie_id
+              OR OLD.roles IS NOT NEW.roles OR OLD.billed IS NOT NEW.billed
+              OR OLD.credit_order IS NOT NEW.credit_order
+        BEGIN
+            UPDATE actor_summary SET dirty = 1 WHERE actor_id IN (OLD.actor_id, NEW.actor_id) AND dirty = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS tr_movie_actors_summary_delete AFTER DELETE ON movie_actors
+        BEGIN
+            UPDATE actor_summary SET dirty = 1 WHERE actor_id = OLD.actor_id AND dirty = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS tr_movies_summary_update
+            AFTER UPDATE OF tomato_meter, popcorn_meter, box_office, release_date ON movies
+            WHEN OLD.tomato_meter IS NOT NEW.tomato_meter OR OLD.popcorn_meter IS NOT NEW.popcorn_meter
+              OR OLD.box_office_usd IS NOT NEW.box_office_usd OR OLD.release_year IS NOT NEW.release_year
+        BEGIN
+            UPDATE actor_summary SET dirty = 1
+            WHERE dirty = 0 AND actor_id IN (SELECT actor_id FROM movie_actors WHERE movie_id = NEW.id);
+        END;
+    """)
+
+
+def _migration_4(conn):
+    # billed: the actor is on OMDb's cast list (or top IMDb billing), set at ingest;
+    # NULL until known. is_starring also needs a character credit, so it is derived
+    # from roles and always agrees with it.
+    _add_column(conn, 'movie_actors', 'billed', 'INTEGER')
+    _add_column(conn, 'movie_actors', 'is_starring',
+                "INTEGER GENERATED ALWAYS AS (billed = 1 AND roles LIKE '%character%') VIRTUAL")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_movie_actors_starring ON movie_actors (actor_id, movie_id) WHERE is_starring = 1")
+    # Summary picks are now limited to starring roles
+    conn.execute("UPDATE actor_summary SET dirty = 1")
+
+
+def _migration_5(conn):
+    # Full-text indexes over titles and names, kept in sync with their tables.
+    # unicode61 folds case and diacritics, so 'Amelie' finds 'Amélie'.
+    for table, column in (('movies', 'title'), ('actors', 'name')):
+        _execute_script(conn, f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5 (
+                {column}, content='{table}', content_rowid='id', tokenize='{FTS_TOKENIZER}'
+            );
+            INSERT INTO {table}_fts ({table}_fts) VALUES ('rebuild');
+            CREATE TRIGGER IF NOT EXISTS tr_{table}_fts_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {table}_fts (rowid, {column}) VALUES (NEW.id, NEW.{column});
+            END;
+            CREATE TRIGGER IF NOT EXISTS tr_{table}_fts_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO {table}_fts ({table}_fts, rowid, {column}) VALUES ('delete', OLD.id, OLD.{column});
+            END;
+            CREATE TRIGGER IF NOT EXISTS tr_{table}_fts_update AFTER UPDATE OF {column} ON {table}
+            BEGIN
+                INSERT INTO {table}_fts ({table}_fts, rowid, {column}) VALUES ('delete', OLD.id, OLD.{column});
+                INSERT INTO {table}_fts (rowid, {column}) VALUES (NEW.id, NEW.{column});
+            END;
+        """)
+
+
+def _migration_6(conn):
+    # Offsets of encoded posters in the append-only pack file (poster_pack.py)
+    _execute_script(conn, """
+        CREATE TABLE IF NOT EXISTS poster_pack (
+            title_key TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            movie_id INTEGER REFERENCES movies (id),
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            source_path TEXT,
+            added_at FLOAT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_poster_pack_movie_id ON poster_pack (movie_id);
+        CREATE INDEX IF NOT EXISTS ix_poster_pack_sha256 ON poster_pack (sha256);
+    """)
+
+
+def _migration_7(conn):
+    # OMDb exports credit directors by name only; bulk_import looks them up here
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_directors_name ON directors (name COLLATE NOCASE)")
+
+
+# Index i holds the migration that takes user_version from i to i + 1
+MIGRATIONS = [
+    _migration_1,
+    _migration_2,
+    _migration_3,
+    _migration_4,
+    _migration_5,
+    _migration_6,
+    _migration_7,
+]
+
+
+def migrate(conn):
+    """Brings the schema up to date. Safe to call on every connect."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        # Schema changes and the version bump commit together or not at all
+        conn.execute("BEGIN")
+        try:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+        print(f"Migrated movies.db to schema version {number}")
+
+
+def connect(db_path=MOVIES_DB_PATH, readonly=False):
+    conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    if readonly:
+        conn.execute("PRAGMA query_only=1")
+    return conn
+
+
+def normalize_name(text):
+    """
+    Lowercased words with diacritics and punctuation removed, the same folding
+    the FTS tokenizer applies: "Amélie: Part II" -> 'amelie part ii'.
+    """
+    text = unicodedata.normalize('NFKD', str(text or '')).replace('&', ' and ')
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    return ' '.join(re.findall(r'[^\W_]+', text))
+
+
+def search_key(text):
+    """normalize_name without spaces, so 'Di Caprio' and 'DiCaprio' compare equal."""
+    return normalize_name(text).replace(' ', '')
+
+
+def fts_query(text):
+    """FTS5 MATCH expression matching any word of `text` (last word as a prefix)."""
+    words = normalize_name(text).split()
+    if not words:
+        return None
+    return ' OR '.join([f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*'])
+
+
+def is_billed(actor_name, omdb_actors):
+    """Whether an actor is on an OMDb 'Actors' billing list ('Brad Pitt, Edward Norton, ...')."""
+    return actor_name.lower() in [actor.strip().lower() for actor in (omdb_actors or '').split(',')]
+
+
+def parse_box_office(value):
+    """'$152.7M', '$1,234' or 1234.0 -> float; None when there is no usable number."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).replace('$', '').replace(',', '').strip()
+    multiplier = 1
+    for suffix, factor in (('B', 1e9), ('M', 1e6), ('K', 1e3)):
+        if text.endswith(suffix):
+            text, multiplier = text[:-1], factor
+            break
+    try:
+        return float(text) * multiplier
+    except ValueError:
+        return None
+
+
+def year_from_release_date(release_date):
+    year = str(release_date or '')[-4:]
+    return year if year.isdigit() else None
+
+
+# Scores RT did not show are NULL and keep the stored ones. RT rounds box
+# office ('$37.6M'), so a stored figure (exact from OMDb or IMDb) is kept and
+# the scraped one only fills in a missing or unknown value.
+# Rows whose values would not change are not written at all.
+ADOPT_MOVIE_VALUES = {
+    'tomato_meter': "COALESCE(:tomato_meter, tomato_meter)",
+    'popcorn_meter': "COALESCE(:popcorn_meter, popcorn_meter)",
+    'box_office': "CASE WHEN CAST(box_office AS REAL) > 0 THEN box_office ELSE COALESCE(:box_office, box_office) END",
+    'release_date': "CASE WHEN release_date IS NULL OR release_date = 'N/A' THEN :year ELSE release_date END",
+}
+SQL_ADOPT_MOVIE = (
+    "UPDATE movies SET " + ", ".join(f"{column} = {value}" for column, value in ADOPT_MOVIE_VALUES.items()) + " "
+    "WHERE id = (SELECT id FROM movies WHERE title = :title "
+    "            AND (:year IS NULL OR release_date IS NULL OR release_date = 'N/A' OR substr(release_date, -4) = :year) "
+    "            LIMIT 1) "
+    "AND (" + " OR ".join(f"{column} IS NOT {value}" for column, value in ADOPT_MOVIE_VALUES.items()) + ")"
+)
+SQL_INSERT_MOVIE = (
+    "INSERT INTO movies (title, tomato_meter, popcorn_meter, box_office, release_date) "
+    "SELECT :title, COALESCE(:tomato_meter, 0), COALESCE(:popcorn_meter, 0), :box_office, :year "
+    "WHERE NOT EXISTS (SELECT 1 FROM movies WHERE title = :title "
+    "                  AND (:year IS NULL OR release_date IS NULL OR release_date = 'N/A' OR substr(release_date, -4) = :year))"
+)
+SQL_MOVIE_ID = (
+    "SELECT id FROM movies WHERE title = :title "
+    "AND (:year IS NULL OR release_date IS NULL OR release_date = 'N/A' OR substr(release_date, -4) = :year) LIMIT 1"
+)
+SQL_ACTOR_BY_NAME = (
+    "SELECT id, birth_date, oscars_wins, oscars_nominations, scraped_at FROM actors WHERE name = ? COLLATE NOCASE LIMIT 1"
+)
+SQL_UPDATE_ACTOR = (
+    "UPDATE actors SET birth_date = COALESCE(:birth_date, birth_date), "
+    "  oscars_wins = COALESCE(:oscars_wins, oscars_wins), "
+    "  oscars_nominations = COALESCE(:oscars_nominations, oscars_nominations), "
+    "  scraped_at = :scraped_at "
+    "WHERE id = :id"
+)
+SQL_INSERT_ACTOR = (
+    "INSERT INTO actors (name, birth_date, oscars_wins, oscars_nominations, scraped_at) "
+    "VALUES (:name, :birth_date, :oscars_wins, :oscars_nominations, :scraped_at)"
+)
+SQL_UPSERT_CREDIT = (
+    "INSERT INTO movie_actors (movie_id, actor_id, roles, credit_order, billed) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (movie_id, actor_id) DO UPDATE SET roles = excluded.roles, credit_order = excluded.credit_order, "
+    "  billed = COALESCE(excluded.billed, billed) "
+    "WHERE roles IS NOT excluded.roles OR credit_order IS NOT excluded.credit_order "
+    "  OR billed IS NOT COALESCE(excluded.billed, billed)"
+)
+SQL_UNBILLED_CREDITS = (
+    "SELECT m.id, m.title FROM movie_actors ma JOIN movies m ON m.id = ma.movie_id "
+    "WHERE ma.actor_id = ? AND ma.billed IS NULL ORDER BY ma.credit_order, m.id"
+)
+SQL_SET_BILLED = "UPDATE movie_actors SET billed = ? WHERE movie_id = ? AND actor_id = ?"
+SQL_STARRING_TITLES = (
+    "SELECT m.title FROM movie_actors ma JOIN movies m ON m.id = ma.movie_id "
+    "WHERE ma.actor_id = ? AND ma.is_starring = 1 AND m.box_office_usd > 0 AND m.release_year <= ? "
+    "ORDER BY ma.credit_order, m.id"
+)
+# Scraped credits (credit_order set) that the latest scrape no longer lists;
+# credits from bulk imports have no credit_order and are never touched
+SQL_DELETE_STALE_CREDITS = (
+    "DELETE FROM movie_actors WHERE actor_id = ? AND credit_order IS NOT NULL "
+    "AND movie_id NOT IN (SELECT value FROM json_each(?))"
+)
+SQL_ACTOR_MOVIES = (
+    "SELECT m.title, m.release_date, m.box_office, m.tomato_meter, m.popcorn_meter, ma.roles "
+    "FROM movie_actors ma JOIN movies m ON m.id = ma.movie_id "
+    "WHERE ma.actor_id = ? ORDER BY ma.credit_order, m.id"
+)
+# Order of Actor.get_summary_movies: best/worst by critics and audience, top grosser.
+# Ties go to the earlier credit, like max()/min() over the scraped list.
+SUMMARY_PICKS = ('top_tomato', 'top_popcorn', 'top_gross', 'low_tomato', 'low_popcorn')
+SQL_SUMMARY_PICKS = """
+    WITH eligible AS (
+        SELECT ma.actor_id, ma.movie_id, ma.credit_order, m.title,
+               m.tomato_meter, m.popcorn_meter, m.box_office_usd
+        FROM movie_actors ma JOIN movies m ON m.id = ma.movie_id
+        WHERE ma.actor_id IN (SELECT value FROM json_each(:actor_ids))
+          AND ma.is_starring = 1
+          AND m.box_office_usd > 0
+          AND m.release_year <= :year
+          AND (:titles IS NULL OR m.title IN (SELECT value FROM json_each(:titles)))
+    ), ranked AS (
+        SELECT actor_id, movie_id, title,
+            COUNT(*) OVER (PARTITION BY actor_id) AS eligible_count,
+            ROW_NUMBER() OVER (PARTITION BY actor_id ORDER BY tomato_meter DESC, credit_order, movie_id) AS top_tomato,
+            ROW_NUMBER() OVER (PARTITION BY actor_id ORDER BY popcorn_meter DESC, credit_order, movie_id) AS top_popcorn,
+            ROW_NUMBER() OVER (PARTITION BY actor_id ORDER BY box_office_usd DESC, credit_order, movie_id) AS top_gross,
+            ROW_NUMBER() OVER (PARTITION BY actor_id ORDER BY tomato_meter, credit_order, movie_id) AS low_tomato,
+            ROW_NUMBER() OVER (PARTITION BY actor_id ORDER BY popcorn_meter, credit_order, movie_id) AS low_popcorn
+        FROM eligible
+    )
+    SELECT actor_id, movie_id, title, eligible_count, top_tomato = 1, top_popcorn = 1, top_gross = 1, low_tomato = 1, low_popcorn = 1
+    FROM ranked
+    WHERE 1 IN (top_tomato, top_popcorn, top_gross, low_tomato, low_popcorn)
+"""
+SQL_ACTOR_AGGREGATES = """
+    SELECT ma.actor_id, ROUND(AVG(m.tomato_meter), 1), ROUND(AVG(m.popcorn_meter), 1),
+           COALESCE(SUM(m.box_office_usd), 0), COUNT(*)
+    FROM movie_actors ma JOIN movies m ON m.id = ma.movie_id
+    WHERE ma.actor_id IN (SELECT value FROM json_each(?))
+    GROUP BY ma.actor_id
+"""
+SQL_DIRTY_ACTORS = "SELECT actor_id FROM actor_summary WHERE dirty = 1 LIMIT ?"
+SQL_SAVE_SUMMARY = (
+    "UPDATE actor_summary SET "
+    "  top_tomato_movie_id = ?, top_popcorn_movie_id = ?, top_gross_movie_id = ?, "
+    "  low_tomato_movie_id = ?, low_popcorn_movie_id = ?, "
+    "  avg_tomato = ?, avg_popcorn = ?, total_box_office_usd = ?, movie_count = ?, eligible_count = ?, "
+    "  dirty = 0, refreshed_at = ? "
+    "WHERE actor_id = ?"
+)
+# Columns of each row _compute_summaries returns, in SQL_SAVE_SUMMARY order
+SUMMARY_COLUMNS = (
+    *(f"{pick}_movie_id" for pick in SUMMARY_PICKS),
+    'avg_tomato', 'avg_popcorn', 'total_box_office_usd', 'movie_count', 'eligible_count', 'refreshed_at', 'actor_id',
+)
+SQL_NEXT_ACTORS = (
+    "SELECT s.actor_id, a.name FROM actor_summary s JOIN actors a ON a.id = s.actor_id "
+    "WHERE s.dirty = 0 AND s.published_at IS NULL AND s.eligible_count >= ? "
+    "ORDER BY s.total_box_office_usd DESC LIMIT ?"
+)
+SQL_MARK_PUBLISHED = "UPDATE actor_summary SET published_at = ? WHERE actor_id = ?"
+SQL_AWARDS = (
+    "SELECT oscars_wins, oscars_nominations FROM actors "
+    "WHERE name = ? COLLATE NOCASE AND oscars_wins IS NOT NULL AND oscars_nominations IS NOT NULL"
+)
+SQL_UPDATE_AWARDS = "UPDATE actors SET oscars_wins = ?, oscars_nominations = ? WHERE name = ? COLLATE NOCASE"
+SQL_INSERT_AWARDS = "INSERT INTO actors (name, oscars_wins, oscars_nominations) VALUES (?, ?, ?)"
+
+
+class MovieDB:
+    def __init__(self, db_path=MOVIES_DB_PATH, read_pool_size=READ_POOL_SIZE):
+        self.db_path = db_path
+        self._writer = connect(db_path)
+        migrate(self._writer)
+        self._write_lock = threading.Lock()
+        self._readers = queue.LifoQueue()
+        self._reader_slots = threading.Semaphore(read_pool_size)
+        self._resolved = {}
+
+    @contextmanager
+    def read(self):
+        """Borrows a read-only connection from the pool."""
+        with self._reader_slots:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                conn = connect(self.db_path, readonly=True)
+            try:
+                yield conn
+            finally:
+                self._readers.put(conn)
+
+    @contextmanager
+    def write(self):
+        """The write connection inside a transaction; writers are serialized."""
+        with self._write_lock:
+            with self._writer:
+                yield self._writer
+
+    # --- movies and actors ---------------------------------------------
+
+    def upsert_movies(self, movies, conn=None):
+        """
+        Bulk upsert of scraped Movie objects, matched on title and year.
+
+        Returns:
+            list: movies.id for each movie, in order; None for movies without a
+                  title, which are skipped
+        """
+        titled = [movie for movie in movies if movie.title and str(movie.title).strip()]
+        rows = [{
+            'title': movie.title,
+            'year': str(movie.year.text) if movie.year.text else None,
+            'tomato_meter': movie.tomato_meter.score if movie.tomato_meter.known else None,
+            'popcorn_meter': movie.popcorn_meter.score if movie.popcorn_meter.known else None,
+            'box_office': _box_office_column(movie.scraped_box_office),
+        } for movie in titled]
+        if len(titled) < len(movies):
+            print(f"Skipping {len(movies) - len(titled)} scraped movies without a title")
+
+        def run(conn):
+            conn.executemany(SQL_ADOPT_MOVIE, rows)
+            conn.executemany(SQL_INSERT_MOVIE, rows)
+            ids = iter([conn.execute(SQL_MOVIE_ID, row).fetchone()[0] for row in rows])
+            titled_ids = {id(movie) for movie in titled}
+            return [next(ids) if id(movie) in titled_ids else None for movie in movies]
+
+        if conn is not None:
+            return run(conn)
+        with self.write() as conn:
+            return run(conn)
+
+    def save_actor(self, actor, birthdate=None, billed=None):
+        """
+        Bulk upsert of an Actor, its movies and credits, stamping it as freshly scraped.
+
+        Args:
+            billed (list): optional per-movie flag, True when the actor is on the
+                           movie's OMDb cast list (None where unknown)
+        """
+        with self.write() as conn:
+            row = conn.execute(SQL_ACTOR_BY_NAME, (actor.name,)).fetchone()
+            params = {
+                'name': actor.name,
+                'birth_date': str(birthdate) if birthdate else None,
+                'oscars_wins': actor.oscar_wins,
+                'oscars_nominations': actor.oscar_nominations,
+                'scraped_at': time.time(),
+            }
+            if row:
+                actor_id = row[0]
+                conn.execute(SQL_UPDATE_ACTOR, {**params, 'id': actor_id})
+            else:
+                actor_id = conn.execute(SQL_INSERT_ACTOR, params).lastrowid
+            movie_ids = self.upsert_movies(actor.movies, conn)
+            # The scrape is the full RT filmography: credits an earlier scrape
+            # added and this one no longer lists are dropped
+            conn.execute(SQL_DELETE_STALE_CREDITS,
+                         (actor_id, json.dumps([movie_id for movie_id in movie_ids if movie_id is not None])))
+            conn.executemany(SQL_UPSERT_CREDIT, [
+                (movie_id, actor_id, movie.role or '', order, None if flag is None else int(flag))
+                for order, (movie_id, movie, flag) in enumerate(zip(movie_ids, actor.movies, billed or [None] * len(movie_ids)))
+                if movie_id is not None
+            ])
+        return actor_id
+
+    def load_actor(self, name, max_age=ACTOR_MAX_AGE):
+        """
+        Stored data for an actor if it was scraped within `max_age` seconds.
+
+        Returns:
+            dict: birthdate, oscar_wins, oscar_nominations and movies (tuples of
+                  title, year, box_office, tomatometer, popcornmeter, credit),
+                  or None when the actor is missing, incomplete or stale
+        """
+        with self.read() as conn:
+            row = conn.execute(SQL_ACTOR_BY_NAME, (name,)).fetchone()
+            if row is None:
+                return None
+            actor_id, birth_date, wins, nominations, scraped_at = row
+            if not scraped_at or time.time() - scraped_at > max_age or not birth_date:
+                return None
+            movies = [
+                (title, year_from_release_date(release_date), box_office, tomato, popcorn, roles)
+                for title, release_date, box_office, tomato, popcorn, roles in conn.execute(SQL_ACTOR_MOVIES, (actor_id,))
+            ]
+        if not movies:
+            return None
+        return {
+            'birthdate': birth_date,
+            'oscar_wins': wins or 0,
+            'oscar_nominations': nominations or 0,
+            'movies': movies,
+        }
+
+    # --- starring roles ---------------------------------------------------
+
+    def actor_id(self, name):
+        with self.read() as conn:
+            row = conn.execute(SQL_ACTOR_BY_NAME, (name,)).fetchone()
+        return row[0] if row else None
+
+    def unbilled_credits(self, actor_id):
+        """(movie_id, title) for credits whose billing has not been looked up yet."""
+        with self.read() as conn:
+            return conn.execute(SQL_UNBILLED_CREDITS, (actor_id,)).fetchall()
+
+    def set_billed(self, actor_id, flags):
+        """Stores billing flags given as {movie_id: bool}."""
+        with self.write() as conn:
+            conn.executemany(SQL_SET_BILLED, [(int(flag), movie_id, actor_id) for movie_id, flag in flags.items()])
+
+    def starring_titles(self, actor_id, year=None):
+        """Released starring roles with a known box office, in credit order."""
+        with self.read() as conn:
+            return [row[0] for row in conn.execute(SQL_STARRING_TITLES, (actor_id, year or datetime.now().year))]
+
+    # --- summary picks ----------------------------------------------------
+
+    def summary_picks(self, actor_ids, titles=None, year=None):
+        """
+        The five summary movies for many actors in one indexed query.
+
+        Only character roles with a known box office, released by `year`
+        (default: this year), are eligible; `titles` narrows that further.
+
+        Returns:
+            dict: actor_id -> list of titles in SUMMARY_PICKS order (None where
+                  an actor has no eligible movie)
+        """
+        actor_ids = list(actor_ids)
+        params = {
+            'actor_ids': json.dumps(actor_ids),
+            'titles': json.dumps(list(titles)) if titles is not None else None,
+            'year': year or datetime.now().year,
+        }
+        picks = {actor_id: [None] * len(SUMMARY_PICKS) for actor_id in actor_ids}
+        with self.read() as conn:
+            for actor_id, _, title, _, *flags in conn.execute(SQL_SUMMARY_PICKS, params):
+                for i, flag in enumerate(flags):
+                    if flag:
+                        picks[actor_id][i] = title
+        return picks
+
+    def summary_picks_for_actor(self, name):
+        """SUMMARY_PICKS titles for one stored actor from actor_summary, or None if the actor is not in movies.db."""
+        summary = self.get_summary(name)
+        if summary is None:
+            return None
+        movie_ids = [summary[f"{pick}_movie_id"] for pick in SUMMARY_PICKS]
+        with self.read() as conn:
+            titles = dict(conn.execute(
+                "SELECT id, title FROM movies WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([movie_id for movie_id in movie_ids if movie_id is not None]),)
+            ).fetchall())
+        return [titles.get(movie_id) for movie_id in movie_ids]
+
+    # --- materialized summaries -------------------------------------------
+
+    def refresh_summaries(self, batch_size=500, year=None, actor_ids=None):
+        """
+        Recomputes actor_summary for actors flagged dirty, batch_size at a time.
+        With `actor_ids`, only those actors are considered.
+
+        Returns:
+            int: number of actors refreshed
+        """
+        refreshed = 0
+        while True:
+            # Computed and stored under the write lock so no change slips in
+            # between reading the credits and clearing the flag
+            with self.write() as conn:
+                if actor_ids is None:
+                    dirty_ids = [row[0] for row in conn.execute(SQL_DIRTY_ACTORS, (batch_size,))]
+                else:
+                    dirty_ids = [row[0] for row in conn.execute(
+                        "SELECT actor_id FROM actor_summary WHERE dirty = 1 AND actor_id IN (SELECT value FROM json_each(?))",
+                        (json.dumps(list(actor_ids)),)
+                    )]
+                if not dirty_ids:
+                    return refreshed
+                rows = self._compute_summaries(conn, dirty_ids, year)
+                conn.executemany(SQL_SAVE_SUMMARY, rows)
+            refreshed += len(dirty_ids)
+
+    def _compute_summaries(self, conn, actor_ids, year=None):
+        ids = json.dumps(actor_ids)
+        picks = {actor_id: [None] * len(SUMMARY_PICKS) for actor_id in actor_ids}
+        eligible = dict.fromkeys(actor_ids, 0)
+        params = {'actor_ids': ids, 'titles': None, 'year': year or datetime.now().year}
+        for actor_id, movie_id, _, eligible_count, *flags in conn.execute(SQL_SUMMARY_PICKS, params):
+            eligible[actor_id] = eligible_count
+            for i, flag in enumerate(flags):
+                if flag:
+                    picks[actor_id][i] = movie_id
+        aggregates = {row[0]: row[1:] for row in conn.execute(SQL_ACTOR_AGGREGATES, (ids,))}
+        now = time.time()
+        return [
+            (*picks[actor_id], *aggregates.get(actor_id, (0, 0, 0, 0)), eligible[actor_id], now, actor_id)
+            for actor_id in actor_ids
+        ]
+
+    def get_summary(self, name):
+        """
+        The actor_summary row for a stored actor as a dict, or None.
+
+        A dirty row is recomputed on the read connection and returned without
+        being stored; refresh_summaries() (e.g. from next_actors) stores it.
+        """
+        with self.read() as conn:
+            row = conn.execute(SQL_ACTOR_BY_NAME, (name,)).fetchone()
+            if row is None:
+                return None
+            cursor = conn.execute("SELECT * FROM actor_summary WHERE actor_id = ?", (row[0],))
+            values = cursor.fetchone()
+            if values is None:
+                return None
+            summary = dict(zip([column[0] for column in cursor.description], values))
+            if summary['dirty']:
+                summary.update(zip(SUMMARY_COLUMNS, self._compute_summaries(conn, [row[0]])[0]))
+                summary['dirty'] = 0
+            return summary
+
+    def next_actors(self, limit=500, min_movies=5):
+        """
+        The next unpublished actors with at least `min_movies` eligible movies,
+        highest grossing first, for a channel batch.
+
+        Dirty summaries are refreshed first so the batch reflects the latest data.
+
+        Returns:
+            list: (actor_id, name) tuples
+        """
+        self.refresh_summaries()
+        with self.read() as conn:
+            return conn.execute(SQL_NEXT_ACTORS, (min_movies, limit)).fetchall()
+
+    def mark_published(self, actor_ids):
+        now = time.time()
+        with self.write() as conn:
+            conn.executemany(SQL_MARK_PUBLISHED, [(now, actor_id) for actor_id in actor_ids])
+
+    # --- name resolution --------------------------------------------------
+
+    def search_titles(self, text, limit=RESOLVE_CANDIDATES):
+        """(id, title, release_year) full-text matches for `text`, best first."""
+        query = fts_query(text)
+        if query is None:
+            return []
+        with self.read() as conn:
+            return conn.execute(
+                "SELECT m.id, m.title, m.release_year FROM movies_fts f JOIN movies m ON m.id = f.rowid "
+                "WHERE movies_fts MATCH ? ORDER BY f.rank LIMIT ?",
+                (query, limit)
+            ).fetchall()
+
+    def search_actors(self, text, limit=RESOLVE_CANDIDATES):
+        """(id, name) full-text matches for `text`, best first."""
+        query = fts_query(text)
+        if query is None:
+            return []
+        with self.read() as conn:
+            return conn.execute(
+                "SELECT a.id, a.name FROM actors_fts f JOIN actors a ON a.id = f.rowid "
+                "WHERE actors_fts MATCH ? ORDER BY f.rank LIMIT ?",
+                (query, limit)
+            ).fetchall()
+
+    def resolve_title(self, title, year=None):
+        """
+        The stored movie a possibly misspelled or differently punctuated title refers to.
+
+        Returns:
+            tuple: (id, title), or None when nothing is close enough
+        """
+        key = search_key(title)
+        memo_key = ('title', key, str(year) if year else None)
+        if memo_key in self._resolved:
+            return self._resolved[memo_key]
+        candidates = [
+            (_similarity(key, search_key(found)), release_year is not None and str(release_year) == str(year), movie_id, found)
+            for movie_id, found, release_year in self.search_titles(title)
+        ]
+        return self._remember(memo_key, _best_match(candidates))
+
+    def resolve_actor(self, name):
+        """
+        The stored actor a possibly misspelled name refers to.
+
+        Returns:
+            tuple: (id, name), or None when nothing is close enough
+        """
+        key = search_key(name)
+        memo_key = ('actor', key, None)
+        if memo_key in self._resolved:
+            return self._resolved[memo_key]
+        candidates = [(_similarity(key, search_key(found)), True, actor_id, found) for actor_id, found in self.search_actors(name)]
+        return self._remember(memo_key, _best_match(candidates))
+
+    def _remember(self, memo_key, match):
+        # Only hits are kept: a miss may be scraped and stored a moment later
+        if match is not None:
+            if len(self._resolved) >= RESOLVE_MEMO_SIZE:
+                self._resolved.clear()
+            self._resolved[memo_key] = match
+        return match
+
+    # --- awards -----------------------------------------------------------
+
+    def get_awards(self, name):
+        with self.read() as conn:
+            row = conn.execute(SQL_AWARDS, (name,)).fetchone()
+        return {'wins': row[0], 'nominations': row[1]} if row else None
+
+    def save_awards(self, name, awards):
+        with self.write() as conn:
+            if not conn.execute(SQL_UPDATE_AWARDS, (awards['wins'], awards['nominations'], name)).rowcount:
+                conn.execute(SQL_INSERT_AWARDS, (name, awards['wins'], awards['nominations']))
+
+
+def _similarity(key, other):
+    if key == other:
+        return 1.0
+    return difflib.SequenceMatcher(None, key, other).ratio()
+
+
+def _best_match(candidates):
+    # candidates: (similarity, year matches, id, name); exact keys and matching years win ties
+    candidates = [candidate for candidate in candidates if candidate[0] >= RESOLVE_THRESHOLD]
+    if not candidates:
+        return None
+    _, _, found_id, found = max(candidates, key=lambda candidate: (candidate[0], candidate[1]))
+    return found_id, found
+
+
+def _box_office_column(text):
+    # Stored like the existing rows: '37562568.0', or '-1' when unknown
+    value = parse_box_office(text)
+    if value is None:
+        return None
+    return '-1' if value < 0 else str(value)
+
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def get_db():
+    """Returns the process-wide MovieDB for MOVIES_DB_PATH (or the MOVIES_DB env override)."""
+    global _db
+    with _db_lock:
+        if _db is None:
+            _db = MovieDB(os.environ.get('MOVIES_DB', MOVIES_DB_PATH),
+                          int(os.environ.get('MOVIES_DB_READ_POOL', READ_POOL_SIZE)))
+        return _db
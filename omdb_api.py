@@ -1,74 +1,79 @@
 from dotenv import load_dotenv
 import requests
 import os
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
+import http_client
+import movie_db
+import omdb_cache
+import omdb_quota
+from omdb_quota import PRIORITY_HIGH, PRIORITY_LOW
+from rate_limiter import RateLimiter
 load_dotenv(override=True)
 api_key = os.getenv('OMDB_API_KEY')
 
-def create_session():
-    session = requests.Session()
-    
-    # Configure retry strategy
-    retries = Retry(
-        total=5,  # number of retries
-        backoff_factor=1,  # wait 1, 2, 4, 8, 16 seconds between retries
-        status_forcelist=[500, 502, 503, 504, 404],
-        allowed_methods=["GET"]
-    )
-    
-    # Add retry adapter to session
-    session.mount('http://', HTTPAdapter(max_retries=retries))
-    session.mount('https://', HTTPAdapter(max_retries=retries))
-    
-    return session
+# Shared by every thread that calls OMDb so batches stay under one overall rate
+rate_limiter = RateLimiter(float(os.environ.get('OMDB_RATE_LIMIT', 10)), float(os.environ.get('OMDB_RATE_BURST', 5)))
+MAX_WORKERS = int(os.environ.get('OMDB_MAX_WORKERS', 8))
 
-def download_movie_posters_omdb(movie_titles, output_folder):
-    # Create the output folder if it doesn't exist
+def create_session():
+    # Kept for callers that want a session; all modules share the pooled client now
+    return http_client.get_session()
+
+def poster_filename(title):
+    return f"{title.replace(' ', '_').replace('/', '_').replace('?', '').replace(':', '')}.jpg"
+
+_poster_folders = {}
+
+def find_local_poster(title, folder):
+    """
+    Finds a title's poster file in `folder` regardless of how its name was munged
+    ('Ocean's Eleven' -> "Ocean's_Eleven.jpg", 'Oceans_Eleven.jpg', ...).
+
+    Returns:
+        str: path to the poster, or None
+    """
+    try:
+        mtime = os.stat(folder).st_mtime
+    except OSError:
+        return None
+    cached = _poster_folders.get(folder)
+    if cached is None or cached[0] != mtime:
+        # Index the folder by normalized file name; rebuilt when its contents change
+        index = {}
+        for name in os.listdir(folder):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() in ('.jpg', '.jpeg', '.png'):
+                index.setdefault(movie_db.search_key(stem), os.path.join(folder, name))
+        cached = _poster_folders[folder] = (mtime, index)
+    return cached[1].get(movie_db.search_key(title))
+
+def _export_posters(paths, output_folder):
+    # Expose stored posters under their title-based file names for older callers
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
+    for title, path in paths.items():
+        if not path:
+            continue
+        target = os.path.join(output_folder, poster_filename(title))
+        if os.path.exists(target):
+            continue
+        try:
+            os.link(path, target)
+        except OSError:
+            shutil.copyfile(path, target)
 
-    base_url = "http://www.omdbapi.com/"
+def download_movie_posters_omdb(movie_titles, output_folder):
+    import poster_store
 
     # Check if movie_titles is a single string or a list
     if isinstance(movie_titles, str):
         movie_titles = [movie_titles]
 
-    for title in movie_titles:
-        # Make a request to the OMDB API
-        params = {
-            'apikey': api_key,
-            't': title,
-            'plot': 'short',
-            'r': 'json'
-        }
-        response = requests.get(base_url, params=params)
-        movie_data = response.json()
-
-        # Check if the movie was found and has a poster
-        if movie_data.get('Response') == 'True' and movie_data.get('Poster') != 'N/A':
-            poster_url = movie_data['Poster']
-            
-            # Get the image file name
-            img_name = f"{title.replace(' ', '_').replace('/', '_').replace('?', '').replace(':', '')}.jpg"
-            
-            # Download the image
-            img_data = requests.get(poster_url).content
-            
-            # Save the image
-            try:
-                with open(os.path.join(output_folder, img_name), 'wb') as handler:
-                    handler.write(img_data)
-                
-                print(f"Downloaded: {img_name}")
-                return True
-            except Exception as e:
-                print(f"Error downloading poster for {title}: {str(e)}")
-                return False
-        else:
-            print(f"No poster found for: {title}")
-            return False
+    paths = poster_store.get_store().download_posters(movie_titles)
+    _export_posters(paths, output_folder)
+    return bool(paths) and all(paths.values())
 
 def get_genre_from_omdb(movie_title):
     return get_movie_data(movie_title).get('Genre', None)
@@ -146,12 +151,33 @@ def get_movie_actors_from_omdb(movie_title):
     return get_movie_data(movie_title).get('Actors', None)
 
 
-def get_movie_data(title, year=None, max_retries=3):
+def get_movie_data(title, year=None, max_retries=3, use_cache=True, stage='lookup', priority=PRIORITY_HIGH):
+    """
+    OMDb data for a title, or None when OMDb has no match.
+
+    `stage` labels the call in the per-stage usage metrics. Near the daily
+    quota expired cache entries are used instead of spending a call, and
+    PRIORITY_LOW requests are skipped (returning None, with nothing cached)
+    so the value is looked up on a later run.
+    """
+    # Cassette runs must see every OMDb call, so the response cache is bypassed
+    cache = omdb_cache.get_cache() if use_cache and not http_client.cassette_active() else None
+    tracker = omdb_quota.get_tracker()
+    if cache is not None:
+        cached = cache.get(title, year, 'movie')
+        if cached is omdb_cache.MISS and tracker.near_limit():
+            cached = cache.get(title, year, 'movie', allow_stale=True)
+        if cached is not omdb_cache.MISS:
+            tracker.record_cache_hit(stage)
+            return cached
+
     base_url = "http://www.omdbapi.com/"
     api_key = os.environ.get('OMDB_API_KEY')
     
     if not api_key:
-        raise ValueError("OMDB_API_KEY not found in environment variables")
+        if not http_client.cassette_active():
+            raise ValueError("OMDB_API_KEY not found in environment variables")
+        api_key = 'cassette'  # keys are never recorded, any value replays
     
     params = {
         'apikey': api_key,
@@ -161,15 +187,18 @@ def get_movie_data(title, year=None, max_retries=3):
     
     if year:
         params['y'] = year
-        
-    session = create_session()
-    
+
     for attempt in range(max_retries):
+        if not http_client.cassette_replaying() and not tracker.reserve(stage, priority):
+            return None
         try:
-            response = session.get(base_url, params=params, timeout=10)
+            rate_limiter.acquire()
+            response = http_client.get(base_url, params=params)
             response.raise_for_status()  # Raise an error for bad status codes
             
             data = response.json()
+            if cache is not None:
+                cache.set(title, year, 'movie', data)
             if data.get('Response') == 'True':
                 return data
             else:
@@ -190,8 +219,35 @@ def get_movie_data(title, year=None, max_retries=3):
             
     return None
 
-def get_box_office_from_omdb(movie_title):
-    box_office = get_movie_data(movie_title).get('BoxOffice', None)
+def get_movie_data_batch(titles, year=None, max_workers=None, stage='lookup', priority=PRIORITY_HIGH):
+    """
+    Looks up many titles concurrently.
+
+    Args:
+        titles (list): Movie titles to look up
+        year (str): Optional release year applied to every title
+        max_workers (int): Maximum number of requests in flight (OMDB_MAX_WORKERS)
+        stage (str): Pipeline stage the calls are counted under
+        priority (int): PRIORITY_HIGH or PRIORITY_LOW, see get_movie_data
+
+    Returns:
+        list: OMDb data (or None) for each title, in the same order as `titles`.
+              A title that raises is reported and returned as None.
+    """
+    def fetch(title):
+        try:
+            return get_movie_data(title, year, stage=stage, priority=priority)
+        except Exception as e:
+            print(f"Error fetching OMDb data for {title}: {str(e)}")
+            return None
+
+    titles = list(titles)
+    if not titles:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers or MAX_WORKERS, len(titles))) as executor:
+        return list(executor.map(fetch, titles))
+
+def parse_box_office(box_office):
     if box_office:
         try:
             # Remove '$' and ',' from the string and convert to float
@@ -201,58 +257,26 @@ def get_box_office_from_omdb(movie_title):
             return -1
     return -1
 
-def download_movie_posters(movie_titles, output_folder):
-    # Create the output folder if it doesn't exist
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
+def get_box_office_from_omdb(movie_title):
+    return parse_box_office((get_movie_data(movie_title) or {}).get('BoxOffice', None))
 
-    base_url = "http://www.omdbapi.com/"
+def get_box_office_batch(titles, max_workers=None):
+    """
+    Box office for many titles in one concurrent, cached batch.
 
-    # Check if movie_titles is a single string or a list
-    # if isinstance(movie_titles, str):
-        # movie_titles = [movie_titles]
-
-    for title in movie_titles:
-        # Make a request to the OMDB API
-        params = {
-            'apikey': api_key,
-            't': title,
-            'plot': 'short',
-            'r': 'json'
-        }
-        response = requests.get(base_url, params=params)
-
-        # Check if the response is successful
-        if response.status_code == 200:
-            try:
-                movie_data = response.json()
-            except requests.exceptions.JSONDecodeError:
-                print(f"Error decoding JSON for movie: {title}")
-                continue
-        else:
-            print(f"Error fetching data for {title}: {response.status_code} - {response.text}")
-            continue
+    Returns:
+        dict: title -> box office as a float, or -1 when OMDb has no usable value
+    """
+    titles = list(dict.fromkeys(titles))
+    movie_data = get_movie_data_batch(titles, max_workers=max_workers, stage='box_office', priority=PRIORITY_LOW)
+    return {title: parse_box_office((data or {}).get('BoxOffice', None)) for title, data in zip(titles, movie_data)}
 
-        # Check if the movie was found and has a poster
-        if movie_data.get('Response') == 'True' and movie_data.get('Poster') != 'N/A':
-            poster_url = movie_data['Poster']
-            
-            # Get the image file name
-            img_name = f"{title.replace(' ', '_').replace('/', '_').replace('?', '').replace(':', '')}.jpg"
-            
-            # Download the image
-            img_data = requests.get(poster_url).content
-            
-            # Save the image
-            try:
-                with open(os.path.join(output_folder, img_name), 'wb') as handler:
-                    handler.write(img_data)
-                
-                print(f"Downloaded: {img_name}")
-                # return os.path.join(output_folder, img_name)
-            except Exception as e:
-                print(f"Error downloading poster for {title}: {str(e)}")
-                return False
-        else:
-            print(f"No poster found for: {title}")
-            return False
+def download_movie_posters(movie_titles, output_folder):
+    import poster_store
+
+    paths = poster_store.get_store().download_posters(movie_titles)
+    _export_posters(paths, output_folder)
+    return bool(paths) and all(paths.values())
+
+def print_usage_metrics():
+    omdb_quota.get_tracker().print_metrics()
@@ -0,0 +1,166 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "omdb_cache.db")
+
+# Found titles rarely change once released, misses are retried sooner
+DEFAULT_TTL = 30 * 24 * 60 * 60
+NEGATIVE_TTL = 24 * 60 * 60
+MAX_ENTRIES = 50000
+# Writes (and last_access touches) between eviction passes
+EVICT_EVERY = 100
+
+# Returned by OmdbCache.get when nothing usable is stored for a key
+MISS = object()
+
+
+class OmdbCache:
+    """
+    Disk-backed cache for OMDb responses keyed by (title, year, type).
+
+    Entries live in a small SQLite database next to movies.db. Successful
+    lookups are kept for `ttl` seconds and "Response: False" lookups are
+    cached as negatives for `negative_ttl` seconds. Once the table grows past
+    `max_entries` the least recently used rows are evicted.
+
+    Hits only touch last_access in memory; the touches are written in one
+    transaction with the next eviction pass (or flush()), so a cache hit
+    never commits.
+    """
+    def __init__(self, db_path=CACHE_DB_PATH, ttl=DEFAULT_TTL, negative_ttl=NEGATIVE_TTL, max_entries=MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes_since_evict = 0
+        self._pending_access = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS omdb_cache (
+                title TEXT NOT NULL,
+                year TEXT NOT NULL,
+                type TEXT NOT NULL,
+                found INTEGER NOT NULL,
+                response TEXT,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (title, year, type)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_omdb_cache_last_access ON omdb_cache (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(title, year=None, type='movie'):
+        return (str(title).strip().lower(), str(year).strip() if year else '', type or '')
+
+    def get(self, title, year=None, type='movie', allow_stale=False):
+        """
+        Returns the cached response dict, None for a cached negative lookup,
+        or MISS when the key is unknown or expired. With allow_stale, expired
+        entries are still returned.
+        """
+        key = self.make_key(title, year, type)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT found, response, expires_at FROM omdb_cache WHERE title=? AND year=? AND type=?",
+                key
+            ).fetchone()
+            if row is None or (row[2] < now and not allow_stale):
+                self.misses += 1
+                return MISS
+            self._pending_access[key] = now
+            self.hits += 1
+            if len(self._pending_access) >= EVICT_EVERY:
+                self._evict()
+        found, response, _ = row
+        return json.loads(response) if found else None
+
+    def set(self, title, year, type, data):
+        """Stores an OMDb response. Pass None (or a "Response: False" payload) to cache a miss."""
+        key = self.make_key(title, year, type)
+        found = bool(data) and data.get('Response') == 'True'
+        now = time.time()
+        expires_at = now + (self.ttl if found else self.negative_ttl)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO omdb_cache "
+                "(title, year, type, found, response, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, int(found), json.dumps(data) if found else None, now, expires_at, now)
+            )
+            self._conn.commit()
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= EVICT_EVERY:
+                self._evict()
+
+    def _flush_access(self):
+        # Caller holds the lock; the caller commits
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE omdb_cache SET last_access=? WHERE title=? AND year=? AND type=?",
+                [(last_access, *key) for key, last_access in self._pending_access.items()]
+            )
+            self._pending_access.clear()
+
+    def _evict(self):
+        # Caller holds the lock
+        self._writes_since_evict = 0
+        self._flush_access()
+        self._conn.execute("DELETE FROM omdb_cache WHERE expires_at < ?", (time.time(),))
+        count = self._conn.execute("SELECT COUNT(*) FROM omdb_cache").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM omdb_cache WHERE rowid IN "
+                "(SELECT rowid FROM omdb_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+        self._conn.commit()
+
+    def evict(self):
+        with self._lock:
+            self._evict()
+
+    def flush(self):
+        """Writes pending last_access touches."""
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._pending_access.clear()
+            self._conn.execute("DELETE FROM omdb_cache")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Returns the process-wide cache, configured from OMDB_CACHE_* environment variables."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = OmdbCache(
+                db_path=os.environ.get('OMDB_CACHE_PATH', CACHE_DB_PATH),
+                ttl=int(os.environ.get('OMDB_CACHE_TTL', DEFAULT_TTL)),
+                negative_ttl=int(os.environ.get('OMDB_CACHE_NEGATIVE_TTL', NEGATIVE_TTL)),
+                max_entries=int(os.environ.get('OMDB_CACHE_MAX_ENTRIES', MAX_ENTRIES))
+            )
+            atexit.register(_cache.flush)
+        return _cache
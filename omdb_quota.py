@@ -0,0 +1,157 @@
+import atexit
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+import omdb_cache
+import requests
+
+# Free OMDb keys allow 1,000 requests per day
+DAILY_QUOTA = 1000
+# Share of the quota kept for high priority calls once usage gets close
+RESERVE_FRACTION = 0.1
+
+PRIORITY_HIGH = 0
+PRIORITY_LOW = 1
+
+
+class QuotaExceededError(requests.exceptions.RequestException):
+    """Raised when the daily OMDb quota is used up."""
+
+
+def _today():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+
+def _seconds_until_reset():
+    now = datetime.now(timezone.utc)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+class QuotaTracker:
+    """
+    Persistent per-day count of OMDb network calls, broken down by pipeline stage.
+
+    Counts are stored in the OMDb cache database so they survive restarts.
+    Cache hits are counted per stage as well, for reporting only; they are
+    kept in memory and written with the next network call, metrics read or
+    flush(), so a cache hit never commits.
+    """
+    def __init__(self, db_path=omdb_cache.CACHE_DB_PATH, daily_quota=DAILY_QUOTA, reserve_fraction=RESERVE_FRACTION):
+        self.daily_quota = daily_quota
+        self.reserve_fraction = reserve_fraction
+        self._lock = threading.Lock()
+        self._pending_hits = {}
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS omdb_quota (
+                day TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                network_calls INTEGER NOT NULL DEFAULT 0,
+                cache_hits INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, stage)
+            )
+        """)
+        self._conn.commit()
+
+    def used_today(self):
+        with self._lock:
+            return self._used(_today())
+
+    def _used(self, day):
+        row = self._conn.execute("SELECT COALESCE(SUM(network_calls), 0) FROM omdb_quota WHERE day=?", (day,)).fetchone()
+        return row[0]
+
+    def near_limit(self):
+        return self.used_today() >= self.daily_quota * (1 - self.reserve_fraction)
+
+    def reserve(self, stage, priority=PRIORITY_HIGH):
+        """
+        Claims one network call for `stage`.
+
+        High priority calls may use the whole quota. Once usage reaches the
+        reserve, low priority calls are refused rather than kept waiting, so
+        their values are left for a later run.
+
+        Returns:
+            bool: True when the call was claimed, False for a refused low priority call
+
+        Raises:
+            QuotaExceededError: the quota is used up
+        """
+        soft_limit = self.daily_quota * (1 - self.reserve_fraction)
+        with self._lock:
+            day = _today()
+            used = self._used(day)
+            if used >= self.daily_quota:
+                raise QuotaExceededError(f"OMDb daily quota of {self.daily_quota} requests used up")
+            if priority != PRIORITY_HIGH and used >= soft_limit:
+                print(f"OMDb quota nearly used ({used}/{self.daily_quota}), skipping low priority '{stage}' request until the reset in {_seconds_until_reset() / 3600:.1f}h")
+                return False
+            self._flush_hits()
+            self._conn.execute(
+                "INSERT INTO omdb_quota (day, stage, network_calls) VALUES (?, ?, 1) "
+                "ON CONFLICT(day, stage) DO UPDATE SET network_calls = network_calls + 1",
+                (day, stage)
+            )
+            self._conn.commit()
+            return True
+
+    def record_cache_hit(self, stage):
+        with self._lock:
+            key = (_today(), stage)
+            self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+
+    def _flush_hits(self):
+        # Caller holds the lock and commits
+        if self._pending_hits:
+            self._conn.executemany(
+                "INSERT INTO omdb_quota (day, stage, cache_hits) VALUES (?, ?, ?) "
+                "ON CONFLICT(day, stage) DO UPDATE SET cache_hits = cache_hits + excluded.cache_hits",
+                [(day, stage, hits) for (day, stage), hits in self._pending_hits.items()]
+            )
+            self._pending_hits.clear()
+
+    def flush(self):
+        """Writes cache hits counted since the last write."""
+        with self._lock:
+            self._flush_hits()
+            self._conn.commit()
+
+    def get_metrics(self, day=None):
+        """Returns {stage: {'network_calls': n, 'cache_hits': m}} for a day (default today)."""
+        with self._lock:
+            self._flush_hits()
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT stage, network_calls, cache_hits FROM omdb_quota WHERE day=? ORDER BY stage",
+                (day or _today(),)
+            ).fetchall()
+        return {stage: {'network_calls': calls, 'cache_hits': hits} for stage, calls, hits in rows}
+
+    def print_metrics(self, day=None):
+        metrics = self.get_metrics(day)
+        total = sum(m['network_calls'] for m in metrics.values())
+        print(f"OMDb usage for {day or _today()}: {total}/{self.daily_quota} calls")
+        for stage, m in metrics.items():
+            print(f"  {stage:12s} {m['network_calls']:6d} calls {m['cache_hits']:6d} cache hits")
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_tracker():
+    """Returns the process-wide tracker, configured from OMDB_DAILY_QUOTA / OMDB_QUOTA_RESERVE."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = QuotaTracker(
+                db_path=os.environ.get('OMDB_CACHE_PATH', omdb_cache.CACHE_DB_PATH),
+                daily_quota=int(os.environ.get('OMDB_DAILY_QUOTA', DAILY_QUOTA)),
+                reserve_fraction=float(os.environ.get('OMDB_QUOTA_RESERVE', RESERVE_FRACTION))
+            )
+            atexit.register(_tracker.flush)
+        return _tracker
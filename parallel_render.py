@@ -0,0 +1,174 @@
+"""
+Renders the panels of a film strip, optionally on a process pool.
+
+Panels render in this process unless RENDER_WORKERS asks for more than one
+worker: with panels at a few milliseconds each, process start-up and shared
+memory page faults outweigh the work on small strips, so measure before
+turning it on.
+
+With workers, the stitched image is a StripCanvas in shared memory owned by
+the caller. Posters are copied into a second shared block, and each worker
+attaches to both and draws its panel straight into its slot, exactly as
+ImageManager.render_film_strip does in one process. Only the Movie and Actor
+objects, without their posters, are pickled, and no pixels come back through
+the pipe. The output is byte-identical to the serial path.
+
+Workers are started once (spawn, so the parent's prefetch threads are never
+forked) and keep their decoded icons, fonts and label sprites between actors.
+"""
+import copy
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+import ImageManager
+
+
+class StripCanvas:
+    """
+    The stitched image for a strip, in shared memory when workers render it.
+
+    Use as a context manager; `image` is only valid inside it.
+
+    Args:
+        movie_count: number of movie panels
+        with_actor: the actor summary opens and closes the strip
+        shared: allocate in shared memory; defaults to worker_count() > 1
+    """
+    def __init__(self, movie_count, with_actor=False, shared=None):
+        panel_shape = ImageManager.film_strip_background().shape
+        self.panel_height = panel_shape[0]
+        self.shape = (panel_shape[0] * (movie_count + (2 if with_actor else 0)), *panel_shape[1:])
+        self.shared = worker_count() > 1 if shared is None else shared
+        self._shm = None
+        if self.shared:
+            self._shm = SharedMemory(create=True, size=int(np.prod(self.shape)))
+            self.image = np.ndarray(self.shape, dtype=np.uint8, buffer=self._shm.buf)
+        else:
+            self.image = np.empty(self.shape, dtype=np.uint8)
+
+    @property
+    def name(self):
+        return self._shm.name if self._shm is not None else None
+
+    def close(self):
+        self.image = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _render_panel(canvas_name, shape, panel_height, index, panel, method, posters_name, poster):
+    # Worker: draw one panel into its slot of the shared canvas
+    canvas_shm = SharedMemory(name=canvas_name)
+    posters_shm = SharedMemory(name=posters_name) if poster is not None else None
+    try:
+        if poster is not None:
+            offset, poster_shape = poster
+            panel.poster_image = np.ndarray(poster_shape, dtype=np.uint8, buffer=posters_shm.buf, offset=offset)
+        canvas = np.ndarray(shape, dtype=np.uint8, buffer=canvas_shm.buf)
+        getattr(panel, method)(out=canvas[index * panel_height:(index + 1) * panel_height])
+        # Views must be gone before the blocks can be closed
+        del canvas
+        panel.poster_image = None
+    finally:
+        canvas_shm.close()
+        if posters_shm is not None:
+            posters_shm.close()
+    return index
+
+
+def _share_posters(movies):
+    # Copies every prefetched poster into one shared block; returns the block
+    # and each movie's (offset, shape), or None where it has no poster
+    posters = [movie.poster_image for movie in movies]
+    size = sum(poster.nbytes for poster in posters if poster is not None)
+    if not size:
+        return None, [None] * len(movies)
+    shm = SharedMemory(create=True, size=size)
+    refs, offset = [], 0
+    for poster in posters:
+        if poster is None:
+            refs.append(None)
+            continue
+        np.ndarray(poster.shape, dtype=np.uint8, buffer=shm.buf, offset=offset)[:] = poster
+        refs.append((offset, poster.shape))
+        offset += poster.nbytes
+    return shm, refs
+
+
+def render_film_strip(movies, actor=None, canvas=None, executor=None):
+    """
+    Renders movie panels, and the actor summary around them, into a canvas.
+
+    Args:
+        movies: Movie objects, posters already prefetched
+        actor: Actor whose summary opens and closes the strip
+        canvas: StripCanvas to render into; a plain array is allocated when None
+        executor: process pool to use; the shared pool from get_pool() by default
+
+    Returns:
+        numpy.ndarray: the stitched image (canvas.image when given), or None without movies
+    """
+    if not movies:
+        return None
+    out = canvas.image if canvas is not None else None
+    if canvas is None or not canvas.shared:
+        return ImageManager.render_film_strip([movie.get_movie_image for movie in movies],
+                                              actor.get_actor_summary_image if actor is not None else None,
+                                              out)
+
+    executor = executor or get_pool()
+    posters_shm, posters = _share_posters(movies)
+    jobs = []
+    for movie, poster in zip(movies, posters):
+        panel = copy.copy(movie)
+        panel.poster_image = None
+        jobs.append((panel, 'get_movie_image', poster))
+    if actor is not None:
+        # The summary panel needs none of the movies (or their posters) to render
+        summary = copy.copy(actor)
+        summary.movies = []
+        jobs.insert(0, (summary, 'get_actor_summary_image', None))
+    try:
+        futures = [executor.submit(_render_panel, canvas.name, canvas.shape, canvas.panel_height, index,
+                                   panel, method, posters_shm.name if posters_shm else None, poster)
+                   for index, (panel, method, poster) in enumerate(jobs)]
+        for future in futures:
+            future.result()
+    finally:
+        if posters_shm is not None:
+            posters_shm.close()
+            posters_shm.unlink()
+    if actor is not None:
+        out[-canvas.panel_height:] = out[:canvas.panel_height]
+    return out
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def worker_count():
+    """RENDER_WORKERS, default 1 (render in this process)."""
+    return max(1, int(os.environ.get('RENDER_WORKERS', 1)))
+
+
+def get_pool():
+    """Returns the process-wide render pool of worker_count() processes."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=worker_count(), mp_context=get_context('spawn'))
+        return _pool
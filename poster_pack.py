@@ -0,0 +1,189 @@
+"""
+Append-only pack file of encoded posters.
+
+Poster JPEGs are concatenated into a single file (posters.pack) and their
+offsets are indexed in the poster_pack table of movies.db, keyed by the
+normalized title. Reads slice a read-only memory map of the pack and hand it
+straight to cv2.imdecode, so a render batch touches one file no matter how
+many posters it needs, and the corpus ships to render nodes as two files.
+
+Build or extend the pack from poster folders (later folders win):
+    python poster_pack.py "posters(1080x1920)" enhanced_posters
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import movie_db
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PACK_PATH = os.path.join(BASE_DIR, "posters.pack")
+POSTER_FOLDERS = [
+    os.path.join(BASE_DIR, "posters(1080x1920)"),
+    os.path.join(BASE_DIR, "enhanced_posters"),
+]
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+SQL_ENTRY_BY_KEY = "SELECT offset, length FROM poster_pack WHERE title_key = ?"
+SQL_ENTRY_BY_MOVIE = "SELECT offset, length FROM poster_pack WHERE movie_id = ? ORDER BY added_at DESC LIMIT 1"
+SQL_ENTRY_BY_SHA = "SELECT offset, length FROM poster_pack WHERE sha256 = ? LIMIT 1"
+SQL_SHA_BY_KEY = "SELECT sha256 FROM poster_pack WHERE title_key = ?"
+SQL_PUT_ENTRY = (
+    "INSERT INTO poster_pack (title_key, title, movie_id, offset, length, sha256, source_path, added_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (title_key) DO UPDATE SET title = excluded.title, movie_id = excluded.movie_id, "
+    "  offset = excluded.offset, length = excluded.length, sha256 = excluded.sha256, "
+    "  source_path = excluded.source_path, added_at = excluded.added_at"
+)
+
+
+def title_from_filename(filename):
+    """'Ocean's_Eleven.jpg' -> "Ocean's Eleven" (munged characters cannot be recovered)."""
+    return os.path.splitext(os.path.basename(filename))[0].replace('_', ' ').strip()
+
+
+class PosterPack:
+    def __init__(self, pack_path=PACK_PATH, db=None):
+        self.pack_path = pack_path
+        self.db = db or movie_db.get_db()
+        self._lock = threading.Lock()
+        self._map = None
+        self._mapped_size = 0
+
+    # --- reading ----------------------------------------------------------
+
+    def lookup(self, title):
+        """(offset, length) of a title's poster in the pack, or None."""
+        with self.db.read() as conn:
+            row = conn.execute(SQL_ENTRY_BY_KEY, (movie_db.search_key(title),)).fetchone()
+        if row is None:
+            match = self.db.resolve_title(title)
+            if match:
+                with self.db.read() as conn:
+                    row = conn.execute(SQL_ENTRY_BY_MOVIE, (match[0],)).fetchone()
+        return row
+
+    def _buffer(self, end):
+        # Remap once the pack has grown past the current mapping. Old maps are
+        # left to the garbage collector in case another thread still reads one.
+        with self._lock:
+            if self._map is None or end > self._mapped_size:
+                if not os.path.exists(self.pack_path) or os.path.getsize(self.pack_path) < end:
+                    return None
+                with open(self.pack_path, 'rb') as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._mapped_size = len(self._map)
+            return self._map
+
+    def read_bytes(self, title):
+        """The encoded poster as a zero-copy memoryview into the pack, or None."""
+        entry = self.lookup(title)
+        if entry is None:
+            return None
+        offset, length = entry
+        buffer = self._buffer(offset + length)
+        if buffer is None:
+            return None
+        return memoryview(buffer)[offset:offset + length]
+
+    def read_image(self, title, flags=cv2.IMREAD_COLOR):
+        """Decodes a title's poster straight from the mapped pack; None if it is not packed."""
+        entry = self.lookup(title)
+        if entry is None:
+            return None
+        offset, length = entry
+        buffer = self._buffer(offset + length)
+        if buffer is None:
+            return None
+        return cv2.imdecode(np.frombuffer(buffer, dtype=np.uint8, count=length, offset=offset), flags)
+
+    # --- writing ----------------------------------------------------------
+
+    def add_many(self, items):
+        """
+        Appends posters to the pack and indexes them in one transaction.
+
+        Identical bytes are stored once; a title that is added again points at
+        its new bytes, the old ones stay in the pack (it is append-only).
+
+        Args:
+            items: iterable of (title, data, source_path)
+
+        Returns:
+            int: number of titles added or updated
+        """
+        count = 0
+        with self._lock, open(self.pack_path, 'ab') as pack, self.db.write() as conn:
+            offset = pack.seek(0, os.SEEK_END)
+            now = time.time()
+            for title, data, source_path in items:
+                key = movie_db.search_key(title)
+                sha256 = hashlib.sha256(data).hexdigest()
+                existing = conn.execute(SQL_SHA_BY_KEY, (key,)).fetchone()
+                if existing and existing[0] == sha256:
+                    continue
+                entry = conn.execute(SQL_ENTRY_BY_SHA, (sha256,)).fetchone()
+                if entry is None:
+                    pack.write(data)
+                    entry = (offset, len(data))
+                    offset += len(data)
+                match = self.db.resolve_title(title)
+                conn.execute(SQL_PUT_ENTRY, (key, match[1] if match else title, match[0] if match else None,
+                                             entry[0], entry[1], sha256, source_path, now))
+                count += 1
+            # Bytes reach the disk before the index that points at them commits
+            pack.flush()
+            os.fsync(pack.fileno())
+        return count
+
+    def add(self, title, data, source_path=None):
+        return self.add_many([(title, data, source_path)])
+
+    def build_from_folders(self, folders=POSTER_FOLDERS):
+        """Packs every poster in `folders`; unchanged posters are skipped, so rebuilding is incremental."""
+        # One file per title: later folders (and later names) win
+        sources = {}
+        for folder in folders:
+            if not os.path.isdir(folder):
+                continue
+            for name in sorted(os.listdir(folder)):
+                if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                    title = title_from_filename(name)
+                    sources[movie_db.search_key(title)] = (title, os.path.join(folder, name))
+
+        def posters():
+            for title, path in sources.values():
+                with open(path, 'rb') as f:
+                    yield title, f.read(), path
+
+        start = time.time()
+        count = self.add_many(posters())
+        print(f"Packed {count} posters into {self.pack_path} in {time.time() - start:.1f}s")
+        return count
+
+
+_pack = None
+_pack_lock = threading.Lock()
+
+
+def get_pack():
+    """Returns the process-wide pack at POSTER_PACK_PATH (default posters.pack)."""
+    global _pack
+    with _pack_lock:
+        if _pack is None:
+            _pack = PosterPack(os.environ.get('POSTER_PACK_PATH', PACK_PATH))
+        return _pack
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Append poster folders to the poster pack.")
+    parser.add_argument('--pack', default=os.environ.get('POSTER_PACK_PATH', PACK_PATH))
+    parser.add_argument('folders', nargs='*', default=POSTER_FOLDERS)
+    args = parser.parse_args()
+    PosterPack(args.pack).build_from_folders(args.folders)
@@ -0,0 +1,157 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+import omdb_api
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "poster_store")
+MAX_WORKERS = 8
+
+
+class PosterStore:
+    """
+    Content-addressed poster storage.
+
+    Poster bytes are stored once under objects/<sha[:2]>/<sha>.jpg no matter how
+    many titles point at them, and index.db maps normalized titles and imdbIDs
+    to the hash. Every finished download is committed immediately, so an
+    interrupted batch resumes where it stopped on the next run.
+    """
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS poster_objects (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS poster_index (
+                title_key TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                imdb_id TEXT,
+                sha256 TEXT NOT NULL REFERENCES poster_objects (sha256),
+                poster_url TEXT,
+                fetched_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_poster_index_imdb_id ON poster_index (imdb_id);
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def title_key(title):
+        return ' '.join(str(title).lower().split())
+
+    def object_path(self, sha256):
+        return os.path.join(self.objects_dir, sha256[:2], f"{sha256}.jpg")
+
+    def lookup(self, title=None, imdb_id=None):
+        """Returns the hash stored for an imdbID or title, or None."""
+        with self._lock:
+            row = None
+            if imdb_id:
+                row = self._conn.execute("SELECT sha256 FROM poster_index WHERE imdb_id=?", (imdb_id,)).fetchone()
+            if row is None and title:
+                row = self._conn.execute("SELECT sha256 FROM poster_index WHERE title_key=?", (self.title_key(title),)).fetchone()
+        return row[0] if row else None
+
+    def get_path(self, title=None, imdb_id=None):
+        """Local file for a poster, or None if it has not been downloaded."""
+        sha256 = self.lookup(title, imdb_id)
+        if sha256 is None:
+            return None
+        path = self.object_path(sha256)
+        return path if os.path.exists(path) else None
+
+    def put(self, title, data, imdb_id=None, poster_url=None):
+        """Stores poster bytes (deduplicated by hash) and indexes them under title/imdbID."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self.object_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so an interrupted download never leaves a partial object
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO poster_objects (sha256, size, created_at) VALUES (?, ?, ?)",
+                (sha256, len(data), now)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO poster_index (title_key, title, imdb_id, sha256, poster_url, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.title_key(title), title, imdb_id, sha256, poster_url, now)
+            )
+            self._conn.commit()
+        return path
+
+    def fetch(self, title):
+        """Returns the local poster for a title, downloading it first if needed."""
+        # Cassette runs must see every poster request, so stored posters are not reused
+        reuse = not http_client.cassette_active()
+        path = self.get_path(title) if reuse else None
+        if path:
+            return path
+        movie_data = omdb_api.get_movie_data(title, stage='posters')
+        if not movie_data:
+            print(f"No poster found for: {title}")
+            return None
+        imdb_id = movie_data.get('imdbID')
+        path = self.get_path(title, imdb_id) if reuse else None
+        if path:
+            return path
+        poster_url = movie_data.get('Poster')
+        if not poster_url or poster_url == 'N/A':
+            print(f"No poster found for: {title}")
+            return None
+        response = http_client.get(poster_url)
+        if response.status_code != 200 or not response.content:
+            print(f"Error downloading poster for {title}: status {response.status_code}")
+            return None
+        path = self.put(title, response.content, imdb_id, poster_url)
+        print(f"Downloaded: {title}")
+        return path
+
+    def download_posters(self, titles, max_workers=MAX_WORKERS):
+        """
+        Fetches posters for many titles concurrently, skipping ones already stored.
+
+        Returns:
+            dict: title -> local poster path (None when no poster is available)
+        """
+        def fetch(title):
+            try:
+                return self.fetch(title)
+            except Exception as e:
+                print(f"Error downloading poster for {title}: {str(e)}")
+                return None
+
+        titles = list(dict.fromkeys(titles))
+        if not titles:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(titles))) as executor:
+            return dict(zip(titles, executor.map(fetch, titles)))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Returns the process-wide store rooted at POSTER_STORE_DIR."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PosterStore(os.environ.get('POSTER_STORE_DIR', STORE_DIR))
+        return _store
@@ -0,0 +1,30 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: `rate` tokens per second, holding at most `burst`.
+
+    acquire() takes a token, sleeping until one is available. A caller that
+    has to wait reserves its token up front, so concurrent workers are served
+    in arrival order and share one overall request rate.
+    """
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,126 @@
+"""
+Parser backends for Rotten Tomatoes celebrity pages.
+
+Both backends return filmography rows as dicts with title, year, tomatometer,
+box_office, audience_score and credit (raw strings, None when missing):
+
+    bs4   BeautifulSoup with html.parser, CSS selectors per field
+    lxml  lxml.html tree walked in document order, stops at the TV header
+"""
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+BACKENDS = ('bs4', 'lxml') if lxml is not None else ('bs4',)
+DEFAULT_BACKEND = 'lxml' if lxml is not None else 'bs4'
+
+
+def resolve_backend(backend):
+    if backend not in ('bs4', 'lxml'):
+        raise ValueError(f"Unknown parser backend: {backend}")
+    if backend == 'lxml' and lxml is None:
+        print("lxml is not installed, falling back to the bs4 parser backend")
+        return 'bs4'
+    return backend
+
+
+# --- bs4 -----------------------------------------------------------------
+
+def parse_soup(html):
+    return BeautifulSoup(html, 'html.parser')
+
+def parse_filmography_bs4(soup):
+    rows = soup.select('tr[data-title]')
+    tv_section = soup.find('rt-text', string=lambda text: text and text.strip() == 'TV')
+    if tv_section:
+        tv_rows = set(map(id, tv_section.find_all_next('tr', attrs={'data-title': True})))
+        rows = [row for row in rows if id(row) not in tv_rows]
+
+    def text_of(row, selector):
+        elem = row.select_one(selector)
+        return elem.text.strip() if elem else None
+
+    def attr_of(row, attr):
+        elem = row.select_one(f'[{attr}]')
+        return elem[attr] if elem else None
+
+    return [{
+        'title': text_of(row, '.celebrity-filmography__title a'),
+        'year': text_of(row, '.celebrity-filmography__year'),
+        'tomatometer': attr_of(row, 'data-tomatometer'),
+        'box_office': text_of(row, '.celebrity-filmography__box-office'),
+        'audience_score': attr_of(row, 'data-audiencescore'),
+        'credit': text_of(row, '.celebrity-filmography__credits'),
+    } for row in rows]
+
+def find_birthday_text_bs4(soup):
+    elem = soup.find('p', class_='celebrity-bio__item', attrs={'data-qa': 'celebrity-bio-bday'})
+    return elem.text if elem else None
+
+def find_portrait_url_bs4(soup, actor_name):
+    name = actor_name.lower()
+    elem = soup.find('img', alt=lambda alt: alt and 'portrait photo of' in alt.lower() and name in alt.lower())
+    return elem['src'] if elem else None
+
+
+# --- lxml ----------------------------------------------------------------
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+if lxml is not None:
+    # Compiled once; each returns matches in document order
+    _title_xpath = etree.XPath(f"(.//*[{_has_class('celebrity-filmography__title')}]//a)[1]")
+    _year_xpath = etree.XPath(f"(.//*[{_has_class('celebrity-filmography__year')}])[1]")
+    _box_office_xpath = etree.XPath(f"(.//*[{_has_class('celebrity-filmography__box-office')}])[1]")
+    _credits_xpath = etree.XPath(f"(.//*[{_has_class('celebrity-filmography__credits')}])[1]")
+    _tomatometer_xpath = etree.XPath("(.//*[@data-tomatometer])[1]/@data-tomatometer")
+    _audience_xpath = etree.XPath("(.//*[@data-audiencescore])[1]/@data-audiencescore")
+    _birthday_xpath = etree.XPath(f"//p[@data-qa='celebrity-bio-bday' and {_has_class('celebrity-bio__item')}]")
+
+def parse_tree(html):
+    return lxml.html.fromstring(html)
+
+def parse_filmography_lxml(tree):
+    def text_of(xpath, row):
+        found = xpath(row)
+        return found[0].text_content().strip() if found else None
+
+    def attr_of(xpath, row):
+        found = xpath(row)
+        return str(found[0]) if found else None
+
+    rows = []
+    # Movie rows come before the TV header, so stop walking there
+    for elem in tree.iter('rt-text', 'tr'):
+        if elem.tag == 'rt-text':
+            if elem.text_content().strip() == 'TV':
+                break
+            continue
+        if elem.get('data-title') is None:
+            continue
+        rows.append({
+            'title': text_of(_title_xpath, elem),
+            'year': text_of(_year_xpath, elem),
+            'tomatometer': attr_of(_tomatometer_xpath, elem),
+            'box_office': text_of(_box_office_xpath, elem),
+            'audience_score': attr_of(_audience_xpath, elem),
+            'credit': text_of(_credits_xpath, elem),
+        })
+    return rows
+
+def find_birthday_text_lxml(tree):
+    found = _birthday_xpath(tree)
+    return found[0].text_content() if found else None
+
+def find_portrait_url_lxml(tree, actor_name):
+    name = actor_name.lower()
+    for img in tree.iter('img'):
+        alt = img.get('alt')
+        if alt and 'portrait photo of' in alt.lower() and name in alt.lower():
+            return img.get('src')
+    return None
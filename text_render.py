@@ -0,0 +1,133 @@
+"""
+TrueType text for the infographic panels.
+
+Fonts are loaded once per (path, pixel size) and every distinct label is
+rasterized once per (font, size, colour) into a read-only BGRA sprite and
+prepared for compositing.blend, so "98.0%" or "$152.7M" on the next panel is
+a cached blit. Text whose font is not a TrueType file (the Hershey
+constants cv2 knows) is still drawn with cv2.putText.
+
+Sizes keep the cv2 convention: at a given scale a TrueType label is no taller
+and no wider than the Hershey face putText drew it with before, so layouts
+written for putText keep their proportions.
+Hershey stroke thickness has no TrueType equivalent and is ignored for
+TrueType fonts; the typeface carries its own weight.
+"""
+import os
+from functools import lru_cache
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+import compositing
+
+# The face labels were drawn with before TrueType support, and its cap height
+# at fontScale 1.0 (getTextSize reports the stroke-inclusive height)
+HERSHEY_REFERENCE = cv2.FONT_HERSHEY_DUPLEX
+HERSHEY_CAP_HEIGHT = 22
+# Labels are mostly figures; their width bounds the size as well
+REFERENCE_DIGITS = "0123456789"
+# Distinct labels across a batch are few (years, scores, box office figures);
+# a prepared score label at the default size is about 1MB
+SPRITE_CACHE_SIZE = 256
+
+
+def is_truetype(font):
+    return isinstance(font, (str, os.PathLike)) and os.path.isfile(font)
+
+
+@lru_cache(maxsize=64)
+def _load_font(font_path, size):
+    return ImageFont.truetype(font_path, size)
+
+
+@lru_cache(maxsize=16)
+def _pixels_per_scale(font_path):
+    # Measured once per typeface at 100px: the size whose "H" matches the
+    # Hershey cap height, capped by the size whose digits match its width
+    font = _load_font(font_path, 100)
+    left, top, right, bottom = font.getbbox("H", anchor='ls')
+    by_height = HERSHEY_CAP_HEIGHT * 100 / max(bottom - top, 1)
+    hershey_width = cv2.getTextSize(REFERENCE_DIGITS, HERSHEY_REFERENCE, 1.0, 1)[0][0]
+    by_width = hershey_width * 100 / max(font.getlength(REFERENCE_DIGITS), 1)
+    return min(by_height, by_width)
+
+
+def pixel_size(font_path, scale):
+    """TrueType pixel size that fits the Hershey reference face at `scale`."""
+    return max(1, round(scale * _pixels_per_scale(font_path)))
+
+
+@lru_cache(maxsize=SPRITE_CACHE_SIZE)
+def text_sprite(text, font_path, size, color):
+    """
+    Rasterized label as a BGRA sprite and its offset from the text origin.
+
+    Args:
+        text: label to draw
+        font_path: TrueType file
+        size: pixel size
+        color: (B, G, R) tuple
+
+    Returns:
+        tuple: (read-only uint8 HxWx4 sprite, dx, dy); the sprite's top-left
+               corner goes at (x + dx, y + dy) for a baseline origin (x, y)
+    """
+    font = _load_font(font_path, size)
+    left, top, right, bottom = font.getbbox(text, anchor='ls')
+    width, height = max(right - left, 1), max(bottom - top, 1)
+    mask = Image.new('L', (width, height), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255, anchor='ls')
+    alpha = np.asarray(mask, dtype=np.uint8)
+    sprite = np.empty((height, width, 4), dtype=np.uint8)
+    sprite[..., :3] = np.asarray(color, dtype=np.uint8)
+    sprite[..., 3] = alpha
+    sprite.setflags(write=False)
+    return sprite, left, top
+
+
+@lru_cache(maxsize=SPRITE_CACHE_SIZE)
+def text_blit(text, font_path, size, color):
+    """text_sprite prepared for compositing.blend: (Blit, dx, dy)."""
+    sprite, dx, dy = text_sprite(text, font_path, size, color)
+    return compositing.prepare(sprite), dx, dy
+
+
+def place_text(text, x, y, scale, color, font, background_shape):
+    """
+    Where and what to blit for a TrueType label.
+
+    Args:
+        text: label to draw
+        x, y: baseline origin
+        scale: cv2-style font scale
+        color: (B, G, R) tuple
+        font: TrueType file path
+        background_shape: shape of the image it will be drawn on
+
+    Returns:
+        tuple: ((y1, y2, x1, x2), Blit) clipped to the background, or None
+               when the label falls outside it
+    """
+    font_path = os.path.abspath(font)
+    key = (text, font_path, pixel_size(font_path, scale), tuple(int(c) for c in color))
+    blit, dx, dy = text_blit(*key)
+    left, top = x + dx, y + dy
+    height, width = blit.shape
+    x1, y1 = max(0, left), max(0, top)
+    x2 = min(background_shape[1], left + width)
+    y2 = min(background_shape[0], top + height)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return (y1, y2, x1, x2), blit.crop(y1 - top, x1 - left, y2 - y1, x2 - x1)
+
+
+def text_size(text, font, scale, thickness):
+    """(width, height) of a label above its baseline, for centring."""
+    if is_truetype(font):
+        font_path = os.path.abspath(font)
+        left, top, right, bottom = _load_font(font_path, pixel_size(font_path, scale)).getbbox(text, anchor='ls')
+        return right - left, -top
+    return cv2.getTextSize(text, font, scale, thickness)[0]
+